@@ -5,7 +5,7 @@ Node API 端點 - 用戶 Grid Node 通訊
 - POST /node/register - Node 註冊
 - POST /node/heartbeat - 心跳回報
 - POST /node/trade - 交易事件
-- GET /node/commands - 獲取待執行命令
+- POST /node/batch - 心跳 + 交易事件 + 命令（單次請求）
 """
 from datetime import datetime, timedelta
 from typing import Any, Optional, List
@@ -69,8 +69,80 @@ class TradeReport(BaseModel):
     pnl: float = 0.0
 
 
-class CommandResponse(BaseModel):
-    commands: List[dict] = []
+class BatchRequest(BaseModel):
+    """心跳與期間累積的交易事件合併回報"""
+    status: HeartbeatRequest
+    trades: List[TradeReport] = []
+    want_commands: bool = True
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Helpers
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _apply_heartbeat(req: HeartbeatRequest, db: Session, current_user: models.User) -> None:
+    """驗證 UID 並更新 NodeStatus（heartbeat 與 batch 共用）"""
+    # 獲取或創建 NodeStatus
+    node_status = db.query(models.NodeStatus).filter(
+        models.NodeStatus.user_id == current_user.id
+    ).first()
+    
+    if not node_status:
+        node_status = models.NodeStatus(user_id=current_user.id)
+        db.add(node_status)
+    
+    # === Anti-Bait-and-Switch Verification ===
+    # 檢查 Node 報告的 UID 是否與用戶註冊的 UID 匹配
+    if req.current_uid and current_user.exchange_uid:
+        if req.current_uid != current_user.exchange_uid:
+            logger.warning(
+                f"UID MISMATCH! User {current_user.email} registered UID: {current_user.exchange_uid}, "
+                f"but Node reported UID: {req.current_uid}"
+            )
+            # 標記為不放行 (未來可改為立即封鎖)
+            # node_status.is_blocked = True  # 需要先在 models.py 新增欄位
+            raise HTTPException(
+                status_code=403,
+                detail=f"UID mismatch: Your API Key's UID ({req.current_uid}) "
+                       f"does not match your registered UID ({current_user.exchange_uid}). "
+                       f"Please use the correct API Key."
+            )
+    
+    # 更新狀態
+    node_status.is_online = True
+    node_status.is_trading = req.is_trading
+    node_status.total_pnl = req.total_pnl
+    node_status.unrealized_pnl = req.unrealized_pnl
+    node_status.equity = req.equity
+    node_status.available_balance = req.available_balance
+    # 分離的 USDT/USDC 餘額
+    node_status.usdt_equity = req.usdt_equity
+    node_status.usdt_available = req.usdt_available
+    node_status.usdc_equity = req.usdc_equity
+    node_status.usdc_available = req.usdc_available
+    node_status.positions = json.dumps(req.positions)
+    node_status.symbols = json.dumps(req.symbols)
+    node_status.last_heartbeat = datetime.utcnow()
+    
+    db.commit()
+
+
+def _record_trade(trade: TradeReport, current_user: models.User) -> dict:
+    """記錄交易事件（trade 與 batch 共用）"""
+    logger.info(
+        f"Trade reported by {current_user.email}: "
+        f"{trade.symbol} {trade.side} @ {trade.price} qty={trade.quantity} pnl={trade.pnl}"
+    )
+    
+    # 可以存入 GridExecution 表（未來擴展）
+    
+    return {"status": "recorded"}
+
+
+def _pending_commands(db: Session, current_user: models.User) -> List[dict]:
+    """取得待執行命令"""
+    # 目前返回空列表，未來可以實現命令隊列
+    return []
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -165,52 +237,10 @@ def node_heartbeat(
     """
     心跳端點 - 更新 Node 狀態
     """
-    # 獲取或創建 NodeStatus
-    node_status = db.query(models.NodeStatus).filter(
-        models.NodeStatus.user_id == current_user.id
-    ).first()
-    
-    if not node_status:
-        node_status = models.NodeStatus(user_id=current_user.id)
-        db.add(node_status)
-    
-    # === Anti-Bait-and-Switch Verification ===
-    # 檢查 Node 報告的 UID 是否與用戶註冊的 UID 匹配
-    if req.current_uid and current_user.exchange_uid:
-        if req.current_uid != current_user.exchange_uid:
-            logger.warning(
-                f"UID MISMATCH! User {current_user.email} registered UID: {current_user.exchange_uid}, "
-                f"but Node reported UID: {req.current_uid}"
-            )
-            # 標記為不放行 (未來可改為立即封鎖)
-            # node_status.is_blocked = True  # 需要先在 models.py 新增欄位
-            raise HTTPException(
-                status_code=403,
-                detail=f"UID mismatch: Your API Key's UID ({req.current_uid}) "
-                       f"does not match your registered UID ({current_user.exchange_uid}). "
-                       f"Please use the correct API Key."
-            )
-    
-    # 更新狀態
-    node_status.is_online = True
-    node_status.is_trading = req.is_trading
-    node_status.total_pnl = req.total_pnl
-    node_status.unrealized_pnl = req.unrealized_pnl
-    node_status.equity = req.equity
-    node_status.available_balance = req.available_balance
-    # 分離的 USDT/USDC 餘額
-    node_status.usdt_equity = req.usdt_equity
-    node_status.usdt_available = req.usdt_available
-    node_status.usdc_equity = req.usdc_equity
-    node_status.usdc_available = req.usdc_available
-    node_status.positions = json.dumps(req.positions)
-    node_status.symbols = json.dumps(req.symbols)
-    node_status.last_heartbeat = datetime.utcnow()
-    
-    db.commit()
+    _apply_heartbeat(req, db, current_user)
     
     # 檢查是否有待執行命令（未來擴展）
-    commands = []
+    commands = _pending_commands(db, current_user)
     
     return {"status": "ok", "commands": commands}
 
@@ -224,30 +254,27 @@ def report_trade(
     """
     交易事件回報
     """
-    logger.info(
-        f"Trade reported by {current_user.email}: "
-        f"{trade.symbol} {trade.side} @ {trade.price} qty={trade.quantity} pnl={trade.pnl}"
-    )
-    
-    # 可以存入 GridExecution 表（未來擴展）
-    
-    return {"status": "recorded"}
+    return _record_trade(trade, current_user)
 
 
-@router.get("/commands", response_model=CommandResponse)
-def get_commands(
+@router.post("/batch")
+def node_batch(
+    req: BatchRequest,
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user)
 ) -> Any:
     """
-    獲取待執行命令
-    
-    命令存儲在某處（例如 Redis 或資料庫），Node 定期拉取
+    批次端點 - 心跳 + 交易事件 + 命令
+
+    Node 將心跳間隔內累積的交易事件隨心跳一次送出，
+    trade_acks 與 trades 順序一一對應
     """
-    # 目前返回空列表，未來可以實現命令隊列
-    commands = []
+    _apply_heartbeat(req.status, db, current_user)
+    
+    trade_acks = [_record_trade(trade, current_user) for trade in req.trades]
+    commands = _pending_commands(db, current_user) if req.want_commands else []
     
-    return CommandResponse(commands=commands)
+    return {"status": "ok", "commands": commands, "trade_acks": trade_acks}
 
 
 @router.get("/status/{user_id}")
@@ -28,6 +28,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict
+from heapq import nlargest
 import numpy as np
 
 # 嘗試使用改進的錯誤處理
@@ -56,6 +57,11 @@ except ImportError:
         return decorator
 
 
+def _grid_suitability(item: Tuple[Any, "AmplitudeStats"]) -> float:
+    """排序鍵：(symbol, AmplitudeStats) 的網格適合度"""
+    return item[1].grid_suitability
+
+
 @dataclass
 class SymbolInfo:
     """交易對信息"""
@@ -320,11 +326,7 @@ class SymbolScanner:
                 ]
                 if cached_results:
                     logger.info("使用快取的振幅數據")
-                    return sorted(
-                        cached_results,
-                        key=lambda x: x[1].grid_suitability,
-                        reverse=True
-                    )[:top_n]
+                    return nlargest(top_n, cached_results, key=_grid_suitability)
 
         # 掃描所有交易對
         symbols = await self.scan_all_symbols(exchange, quote_currency)
@@ -366,10 +368,8 @@ class SymbolScanner:
         filtered = self._filter_candidates(results)
         logger.info(f"篩選後剩餘 {len(filtered)} 個候選")
 
-        # 按網格適合度排序
-        filtered.sort(key=lambda x: x[1].grid_suitability, reverse=True)
-
-        return filtered[:top_n]
+        # 按網格適合度取前 N 個 (只需部分排序)
+        return nlargest(top_n, filtered, key=_grid_suitability)
 
     def _filter_candidates(
         self,
@@ -438,8 +438,7 @@ class SymbolScanner:
                     if stats.volume_24h >= self.config['min_volume_24h']:
                         filtered.append((sym, stats))
 
-        filtered.sort(key=lambda x: x[1].grid_suitability, reverse=True)
-        return [sym for sym, _ in filtered[:limit]]
+        return [sym for sym, _ in nlargest(limit, filtered, key=_grid_suitability)]
 
 
 # ========== 便捷函數 ==========
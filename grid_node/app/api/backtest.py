@@ -6,6 +6,7 @@
 import asyncio
 import logging
 import os
+import time
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from fastapi import APIRouter, HTTPException, BackgroundTasks
@@ -90,7 +91,6 @@ async def run_backtest(req: BacktestRequest):
     
     對應 GUI: BacktestPage._run_backtest()
     """
-    import time
     start_time = time.time()
     
     try:
@@ -194,7 +194,7 @@ async def run_backtest(req: BacktestRequest):
 
 
 @router.get("/result/{symbol}")
-def get_backtest_result(symbol: str):
+async def get_backtest_result(symbol: str):
     """
     獲取之前的回測結果
     """
@@ -212,7 +212,6 @@ async def optimize_parameters(req: OptimizeRequest):
     
     警告：這可能需要較長時間！
     """
-    import time
     start_time = time.time()
     
     try:
@@ -310,7 +309,7 @@ async def optimize_parameters(req: OptimizeRequest):
 
 
 @router.get("/optimize/result/{symbol}")
-def get_optimize_result(symbol: str):
+async def get_optimize_result(symbol: str):
     """
     獲取之前的優化結果
     """
@@ -331,7 +330,6 @@ async def smart_optimize(req: OptimizeRequest):
     對應 GUI: BacktestPage 智能優化按鈕
     使用 Tree-structured Parzen Estimator 進行貝葉斯優化
     """
-    import time
     start_time = time.time()
     
     try:
@@ -429,7 +427,7 @@ async def smart_optimize(req: OptimizeRequest):
 
 
 @router.get("/top_results/{symbol}")
-def get_top_results(symbol: str):
+async def get_top_results(symbol: str):
     """
     獲取 Top 5 優化結果
     
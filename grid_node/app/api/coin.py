@@ -4,12 +4,31 @@
 封裝 coin_selection 模組，提供 REST API
 """
 import asyncio
+import functools
 import logging
 import os
-from typing import List, Optional, Dict, Any
+import time
+from typing import List, Optional, Dict, Any, Tuple
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 import ccxt.async_support as ccxt
+import numpy as np
+from app.services.bot_manager import bot_manager
+
+# 選幣模組於啟動時載入一次，避免在請求中付出匯入成本
+try:
+    from coin_selection import CoinScorer, CoinRanker, CoinRotator
+    from coin_selection.symbol_scanner import SymbolScanner
+    _COIN_OK = True
+    _COIN_ERR = None
+except ImportError as _e:
+    _COIN_OK = False
+    _COIN_ERR = _e
+
+try:
+    from coin_selection import get_cached_rankings as _load_cached_rankings
+except ImportError:
+    _load_cached_rankings = None
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -63,26 +82,175 @@ class RotationSignal(BaseModel):
 # Helper
 # ═══════════════════════════════════════════════════════════════════════════
 
+# 交易所請求併發上限（在 ccxt 自身的限速之上再加一層保護）
+_EXCH_SEM = asyncio.Semaphore(int(os.getenv("EXCHANGE_MAX_CONCURRENCY", "8")))
+_EXCH_RETRIES = 3
+
+
+async def call_exchange(coro_fn, *args, **kwargs):
+    """
+    調用交易所 API
+
+    受併發上限保護，遇到限流或網路錯誤時以指數退避重試
+    """
+    async with _EXCH_SEM:
+        for attempt in range(_EXCH_RETRIES):
+            try:
+                return await coro_fn(*args, **kwargs)
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection, ccxt.NetworkError) as e:
+                if attempt == _EXCH_RETRIES - 1:
+                    raise
+                delay = 0.5 * 2 ** attempt
+                logger.warning(f"Exchange call failed ({e.__class__.__name__}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+
+
+class ThrottledExchange:
+    """
+    交易所代理
+
+    fetch_* 方法經由 call_exchange 調用，其餘屬性直接轉發，
+    讓 coin_selection 模組無需修改即可共用併發上限與重試
+    """
+
+    def __init__(self, exchange: ccxt.bitget):
+        self._exchange = exchange
+        self._users = 0  # 持有此實例的請求數（acquire_exchange / release_exchange）
+        self._retired = False  # 已被新憑證的實例取代，最後一個請求結束後關閉
+
+    def __getattr__(self, name):
+        attr = getattr(self._exchange, name)
+        if name.startswith("fetch_") and callable(attr):
+            return functools.partial(call_exchange, attr)
+        return attr
+
+
+# 共用交易所連接（首次使用時建立，憑證變更時重建，應用關閉時釋放）
+_exchange: Optional[ThrottledExchange] = None
+_exchange_key: Optional[Tuple[str, str, str]] = None  # 建立 _exchange 時使用的憑證
+_exchange_lock = asyncio.Lock()
+
+
 async def get_exchange():
-    """獲取交易所連接"""
-    api_key = os.getenv("EXCHANGE_API_KEY")
-    api_secret = os.getenv("EXCHANGE_SECRET")
-    passphrase = os.getenv("EXCHANGE_PASSPHRASE")
-    
-    if not api_key or not api_secret:
-        raise HTTPException(503, "Exchange not configured")
-    
-    exchange = ccxt.bitget({
-        'apiKey': api_key,
-        'secret': api_secret,
-        'password': passphrase,
-        'enableRateLimit': True,
-        'options': {'defaultType': 'swap'}
-    })
-    
+    """
+    獲取交易所連接
+
+    返回共用的 ccxt 實例，避免每次請求重建連線池與重新載入市場資訊；
+    憑證變更時（如 initialize 取得官方下發的憑證）以新憑證重建並先換上新實例，
+    舊實例待持有它的請求全部結束後才關閉（見 acquire_exchange）
+    """
+    global _exchange, _exchange_key
+
+    key = bot_manager.get_credentials()
+    if _exchange is not None and key == _exchange_key:
+        return _exchange
+
+    async with _exchange_lock:
+        if _exchange is None or key != _exchange_key:
+            api_key, api_secret, passphrase = key
+
+            if not api_key or not api_secret:
+                raise HTTPException(503, "Exchange not configured")
+
+            exchange = ccxt.bitget({
+                'apiKey': api_key,
+                'secret': api_secret,
+                'password': passphrase,
+                'enableRateLimit': True,
+                'options': {'defaultType': 'swap'}
+            })
+
+            # 市場資訊只載入一次，之後的掃描直接重用
+            try:
+                await exchange.load_markets()
+            except Exception as e:
+                await exchange.close()
+                logger.error(f"Failed to load markets: {e}")
+                raise HTTPException(503, "Exchange not available")
+
+            previous = _exchange
+            _exchange = ThrottledExchange(exchange)
+            _exchange_key = key
+
+            if previous is not None:
+                logger.info("Exchange credentials changed, rebuilt exchange connection")
+                previous._retired = True
+                if not previous._users:
+                    await previous.close()
+
+    return _exchange
+
+
+async def acquire_exchange() -> ThrottledExchange:
+    """取得共用交易所連接並登記使用中，請求結束時須調用 release_exchange"""
+    exchange = await get_exchange()
+    exchange._users += 1
     return exchange
 
 
+async def release_exchange(exchange: ThrottledExchange):
+    """結束使用交易所連接；已被取代的實例在最後一個使用者結束時關閉"""
+    exchange._users -= 1
+    if exchange._retired and not exchange._users:
+        await exchange.close()
+
+
+async def close_exchange():
+    """關閉共用交易所連接（應用關閉時調用）"""
+    global _exchange, _exchange_key
+
+    if _exchange is not None:
+        await _exchange.close()
+        _exchange = None
+        _exchange_key = None
+
+
+def _top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    返回前 k 大數值的索引
+
+    以 partition 找出第 k 大的門檻值做部分選取，再只對選中的 k 個排序；
+    結果按數值降序，同分時保持原始順序（與 sorted 結果一致）
+    """
+    n = len(values)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        threshold = np.partition(values, n - k)[n - k]
+        above = np.flatnonzero(values > threshold)
+        ties = np.flatnonzero(values == threshold)[:k - len(above)]
+        idx = np.sort(np.concatenate((above, ties)))
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(-values[idx], kind="stable")]
+
+
+# 常見交易所錯誤對應的固定響應（不回傳原始錯誤訊息）
+# 子類別需排在父類別 NetworkError 之前
+_EXCHANGE_ERRORS = (
+    (ccxt.RateLimitExceeded, 429, "Exchange rate limit exceeded, retry later"),
+    (ccxt.DDoSProtection, 429, "Exchange rate limit exceeded, retry later"),
+    (ccxt.ExchangeNotAvailable, 503, "Exchange not available"),
+    (ccxt.NetworkError, 502, "Exchange network error"),
+)
+
+
+def _exchange_http_error(exc: Exception) -> HTTPException:
+    """將 ccxt 網路類錯誤轉為固定的 HTTPException"""
+    for exc_type, status_code, detail in _EXCHANGE_ERRORS:
+        if isinstance(exc, exc_type):
+            return HTTPException(status_code, detail)
+    return HTTPException(502, "Exchange network error")
+
+
+# 網格適合度達此分數標記為 WATCH，否則 AVOID
+WATCH_THRESHOLD = 60
+
+# 掃描結果快取 {limit: (建立時間, ScanResponse)}
+SCAN_CACHE_TTL = 30  # 秒
+_scan_cache: Dict[int, Tuple[float, ScanResponse]] = {}
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Endpoints
 # ═══════════════════════════════════════════════════════════════════════════
@@ -94,16 +262,20 @@ async def scan_all_symbols(req: ScanRequest):
     
     對應 GUI: CoinSelectionPage._scan_all_symbols()
     """
-    import time
     start_time = time.time()
     
-    exchange = await get_exchange()
+    # 非強制刷新時，TTL 內直接返回上次結果
+    if not req.force_refresh:
+        cached_at, cached = _scan_cache.get(req.limit, (0, None))
+        if cached is not None and start_time - cached_at < SCAN_CACHE_TTL:
+            return cached
+    
+    if not _COIN_OK:
+        raise HTTPException(500, f"Coin selection module not available: {_COIN_ERR}")
+    
+    exchange = await acquire_exchange()
     
     try:
-        # 導入選幣模組
-        from coin_selection import CoinScorer, CoinRanker
-        from coin_selection.symbol_scanner import SymbolScanner
-        
         # 掃描交易對
         scanner = SymbolScanner()
         
@@ -116,52 +288,67 @@ async def scan_all_symbols(req: ScanRequest):
         )
         
         # 合併結果
-        all_candidates = usdc_results + usdt_results
-        
-        # scan_with_amplitude 已經按 grid_suitability 排序，取前 N 個
         # 結構: [(SymbolInfo, AmplitudeStats), ...]
-        all_candidates.sort(key=lambda x: x[1].grid_suitability if x[1] else 0, reverse=True)
-        candidates = all_candidates[:req.limit]
+        # 適合度抽成連續陣列，以向量化 top-k 選出前 N 個
+        all_candidates = usdc_results + usdt_results
+        suitability = np.fromiter(
+            (stats.grid_suitability if stats else 0.0 for _, stats in all_candidates),
+            dtype=np.float64,
+            count=len(all_candidates)
+        )
+        top_idx = _top_k_indices(suitability, req.limit)
+        candidates = [all_candidates[i] for i in top_idx]
         
         if not candidates:
-            return ScanResponse(
+            response = ScanResponse.model_construct(
                 rankings=[],
                 elapsed_seconds=time.time() - start_time,
                 message="No suitable symbols found"
             )
+            _scan_cache[req.limit] = (time.time(), response)
+            return response
+        
+        # 適合度與建議動作一次性向量化計算
+        top_scores = suitability[top_idx]
+        actions = np.where(top_scores >= WATCH_THRESHOLD, "WATCH", "AVOID").tolist()
         
         # 直接從 AmplitudeStats 建立排名結果
+        # 數據來自內部物件，使用 model_construct 跳過逐欄位驗證
         result_rankings = []
-        for i, (sym_info, amp_stats) in enumerate(candidates):
+        for i, ((sym_info, amp_stats), score, action) in enumerate(
+            zip(candidates, top_scores.tolist(), actions)
+        ):
             if amp_stats:
-                result_rankings.append(SymbolRanking(
+                result_rankings.append(SymbolRanking.model_construct(
                     symbol=sym_info.ccxt_symbol,
                     rank=i + 1,
-                    total_score=amp_stats.grid_suitability,
+                    total_score=score,
                     amplitude=amp_stats.avg_amplitude,
                     trend=amp_stats.total_change,
                     volume_24h=amp_stats.volume_24h,
                     price=amp_stats.last_price,
-                    grid_suitability=amp_stats.grid_suitability,
-                    action="WATCH" if amp_stats.grid_suitability >= 60 else "AVOID"
+                    grid_suitability=score,
+                    action=action
                 ))
         
         elapsed = time.time() - start_time
         
-        return ScanResponse(
+        response = ScanResponse.model_construct(
             rankings=result_rankings,
             elapsed_seconds=elapsed,
             message=f"Found {len(result_rankings)} candidates"
         )
+        _scan_cache[req.limit] = (time.time(), response)
+        return response
     
-    except ImportError as e:
-        logger.error(f"Import error: {e}")
-        raise HTTPException(500, f"Coin selection module not available: {e}")
-    except Exception as e:
-        logger.error(f"Scan error: {e}")
-        raise HTTPException(500, str(e))
+    except ccxt.NetworkError as e:
+        logger.warning(f"Scan exchange error: {e.__class__.__name__}")
+        raise _exchange_http_error(e)
+    except Exception:
+        logger.exception("Scan error")
+        raise HTTPException(500, "Scan failed")
     finally:
-        await exchange.close()
+        await release_exchange(exchange)
 
 
 @router.get("/rankings")
@@ -169,17 +356,15 @@ async def get_cached_rankings():
     """
     獲取快取的評分排名（不重新掃描）
     """
-    try:
-        from coin_selection import get_cached_rankings
-        rankings = get_cached_rankings()
-        
-        if not rankings:
-            return {"rankings": [], "message": "No cached rankings. Run scan first."}
-        
-        return {"rankings": rankings}
-    
-    except ImportError:
+    if _load_cached_rankings is None:
         return {"rankings": [], "message": "Coin selection module not available"}
+    
+    rankings = _load_cached_rankings()
+    
+    if not rankings:
+        return {"rankings": [], "message": "No cached rankings. Run scan first."}
+    
+    return {"rankings": rankings}
 
 
 @router.post("/rotation/check", response_model=RotationSignal)
@@ -189,11 +374,12 @@ async def check_rotation(req: RotationCheckRequest):
     
     對應 GUI: CoinSelectionPage._check_rotation()
     """
-    exchange = await get_exchange()
+    if not _COIN_OK:
+        raise HTTPException(500, f"Rotation module not available: {_COIN_ERR}")
+    
+    exchange = await acquire_exchange()
     
     try:
-        from coin_selection import CoinScorer, CoinRanker, CoinRotator
-        
         scorer = CoinScorer()
         ranker = CoinRanker(scorer)
         rotator = CoinRotator(ranker)
@@ -204,6 +390,8 @@ async def check_rotation(req: RotationCheckRequest):
             "SOL/USDC:USDC", "ADA/USDC:USDC", "LINK/USDC:USDC"
         ]
         
+        # 候選幣種由 CoinScorer.score_all 並行評分 (asyncio.gather)，
+        # 交易所請求經由共用併發上限
         signal = await rotator.check_rotation(
             req.current_symbol,
             exchange,
@@ -214,10 +402,10 @@ async def check_rotation(req: RotationCheckRequest):
         if signal:
             return RotationSignal(
                 should_rotate=True,
-                current_symbol=signal.current_symbol,
-                suggested_symbol=signal.new_symbol,
+                current_symbol=signal.from_symbol,
+                suggested_symbol=signal.to_symbol,
                 reason=signal.reason,
-                score_improvement=signal.score_improvement
+                score_improvement=signal.score_diff
             )
         else:
             return RotationSignal(
@@ -228,13 +416,14 @@ async def check_rotation(req: RotationCheckRequest):
                 score_improvement=0
             )
     
-    except ImportError as e:
-        raise HTTPException(500, f"Rotation module not available: {e}")
-    except Exception as e:
-        logger.error(f"Rotation check error: {e}")
-        raise HTTPException(500, str(e))
+    except ccxt.NetworkError as e:
+        logger.warning(f"Rotation check exchange error: {e.__class__.__name__}")
+        raise _exchange_http_error(e)
+    except Exception:
+        logger.exception("Rotation check error")
+        raise HTTPException(500, "Rotation check failed")
     finally:
-        await exchange.close()
+        await release_exchange(exchange)
 
 
 @router.post("/rotation/execute")
@@ -15,11 +15,12 @@ SSE (Server-Sent Events) 端點 - 即時數據推送
 ═══════════════════════════════════════════════════════════════════════════
 """
 import asyncio
-import json
+import hmac
 import logging
 from datetime import datetime
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, Optional, Set
 
+import orjson
 from fastapi import APIRouter, Header, HTTPException
 from fastapi.responses import StreamingResponse
 
@@ -34,18 +35,156 @@ STATUS_INTERVAL = 5
 ACCOUNT_INTERVAL = 10
 
 
+# 預先編碼，驗證時以常數時間比對（避免時序攻擊）
+_NODE_SECRET = settings.NODE_SECRET.encode()
+
+
 async def verify_secret_sse(x_node_secret: str = None) -> bool:
     """驗證 Node Secret (SSE 用)"""
     if not x_node_secret:
         return False
-    return x_node_secret == settings.NODE_SECRET
+    return hmac.compare_digest(_NODE_SECRET, x_node_secret.encode())
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 事件發布（單一發布任務，所有 SSE 連線共用）
+# ═══════════════════════════════════════════════════════════════════════════
+
+# 無事件時的心跳間隔 (秒)
+HEARTBEAT_INTERVAL = 1
+# 每個連線最多積壓的事件數，超過則丟棄（慢速客戶端不拖累其他連線）
+SUBSCRIBER_QUEUE_SIZE = 100
+
+_subscribers: Set[asyncio.Queue] = set()
+_publisher_task: Optional[asyncio.Task] = None
+# 最近一次的狀態事件（已編碼），新連線加入時立即補發
+_latest_events: Dict[str, bytes] = {}
+_REPLAY_EVENTS = ("connection_status", "status_update", "account_update", "position_update")
+
+
+def _subscribe() -> asyncio.Queue:
+    """註冊 SSE 連線，必要時啟動發布任務"""
+    global _publisher_task
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    for event_type in _REPLAY_EVENTS:
+        if event_type in _latest_events:
+            queue.put_nowait(_latest_events[event_type])
+    _subscribers.add(queue)
+
+    if _publisher_task is None or _publisher_task.done():
+        _publisher_task = asyncio.create_task(_publisher_loop())
 
+    return queue
+
+
+def _unsubscribe(queue: asyncio.Queue):
+    """移除 SSE 連線"""
+    _subscribers.discard(queue)
+
+
+def _publish(event_type: str, data: dict):
+    """發布事件到所有連線（每個事件只編碼一次）"""
+    _publish_frame(event_type, format_sse_event(event_type, data))
+
+
+def _publish_frame(event_type: str, frame: bytes):
+    """發布已編碼的事件"""
+    if event_type in _REPLAY_EVENTS:
+        _latest_events[event_type] = frame
+
+    for queue in _subscribers:
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            logger.debug(f"SSE subscriber queue full, dropping {event_type}")
+
+
+async def _publisher_loop():
+    """
+    定期讀取交易狀態並發布事件
 
-async def event_generator(node_secret: str) -> AsyncGenerator[str, None]:
+    只在有連線時運行，最後一個連線斷開後自動結束
+    """
+    global _publisher_task
+
+    last_status_time = 0
+    last_account_time = 0
+    last_connection_status = None
+    last_status_frame = None
+    last_positions = None
+    loop = asyncio.get_running_loop()
+
+    try:
+        while _subscribers:
+            try:
+                current_time = loop.time()
+                # 每輪取一次時間，datetime 直接交給 orjson 序列化
+                now = datetime.utcnow()
+
+                # 檢查連線狀態變更
+                connection_status = bot_manager.get_connection_status()
+                if connection_status != last_connection_status:
+                    _publish("connection_status", connection_status)
+                    last_connection_status = connection_status.copy()
+
+                status_due = current_time - last_status_time >= STATUS_INTERVAL
+                account_due = current_time - last_account_time >= ACCOUNT_INTERVAL
+                is_trading = bot_manager.is_trading
+
+                # 每輪最多讀取一次狀態，供以下三類事件共用
+                if status_due or account_due or is_trading:
+                    status = await bot_manager.get_status()
+
+                # 狀態更新 (每 5 秒，內容未變時不重複推送)
+                if status_due:
+                    frame = format_sse_event("status_update", status)
+                    if frame != last_status_frame:
+                        _publish_frame("status_update", frame)
+                        last_status_frame = frame
+                    last_status_time = current_time
+
+                # 帳戶餘額更新 (每 10 秒)
+                if account_due:
+                    account_data = {
+                        "equity": status.get("equity", 0),
+                        "available_balance": status.get("available_balance", 0),
+                        "unrealized_pnl": status.get("unrealized_pnl", 0),
+                        "usdt_equity": status.get("usdt_equity", 0),
+                        "usdt_available": status.get("usdt_available", 0),
+                        "usdc_equity": status.get("usdc_equity", 0),
+                        "usdc_available": status.get("usdc_available", 0),
+                        "timestamp": now
+                    }
+                    _publish("account_update", account_data)
+                    last_account_time = current_time
+
+                # 持倉更新 (持倉變動時推送)
+                if is_trading:
+                    positions = status.get("positions", [])
+                    if positions and positions != last_positions:
+                        last_positions = positions
+                        _publish("position_update", {
+                            "positions": positions,
+                            "timestamp": now
+                        })
+
+            except Exception as e:
+                logger.error(f"SSE publisher error: {e}")
+                _publish("error", {"message": str(e)})
+
+            await asyncio.sleep(1)
+
+    finally:
+        _publisher_task = None
+        _latest_events.clear()
+
+
+async def event_generator(node_secret: str) -> AsyncGenerator[bytes, None]:
     """
     SSE 事件生成器
 
-    持續推送交易狀態更新到前端
+    從共用發布任務接收事件並推送到前端，閒置時發送心跳
     """
     # 驗證
     if not await verify_secret_sse(node_secret):
@@ -57,61 +196,24 @@ async def event_generator(node_secret: str) -> AsyncGenerator[str, None]:
     # 發送初始連線確認
     yield format_sse_event("connected", {
         "message": "SSE connection established",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow()
     })
 
-    last_status_time = 0
-    last_account_time = 0
-    last_connection_status = None
+    queue = _subscribe()
 
     try:
         while True:
-            current_time = asyncio.get_event_loop().time()
-
-            # 檢查連線狀態變更
-            connection_status = bot_manager.get_connection_status()
-            if connection_status != last_connection_status:
-                yield format_sse_event("connection_status", connection_status)
-                last_connection_status = connection_status.copy()
-
-            # 狀態更新 (每 5 秒)
-            if current_time - last_status_time >= STATUS_INTERVAL:
-                status = bot_manager.get_status()
-                yield format_sse_event("status_update", status)
-                last_status_time = current_time
-
-            # 帳戶餘額更新 (每 10 秒)
-            if current_time - last_account_time >= ACCOUNT_INTERVAL:
-                status = bot_manager.get_status()
-                account_data = {
-                    "equity": status.get("equity", 0),
-                    "available_balance": status.get("available_balance", 0),
-                    "unrealized_pnl": status.get("unrealized_pnl", 0),
-                    "usdt_equity": status.get("usdt_equity", 0),
-                    "usdt_available": status.get("usdt_available", 0),
-                    "usdc_equity": status.get("usdc_equity", 0),
-                    "usdc_available": status.get("usdc_available", 0),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                yield format_sse_event("account_update", account_data)
-                last_account_time = current_time
-
-            # 持倉更新 (與狀態更新一起)
-            if bot_manager.is_trading:
-                status = bot_manager.get_status()
-                positions = status.get("positions", [])
-                if positions:
-                    yield format_sse_event("position_update", {
-                        "positions": positions,
-                        "timestamp": datetime.utcnow().isoformat()
-                    })
-
-            # 心跳 (防止連線超時)
-            yield format_sse_event("heartbeat", {
-                "timestamp": datetime.utcnow().isoformat()
-            })
-
-            await asyncio.sleep(1)
+            try:
+                frame = await asyncio.wait_for(
+                    queue.get(), timeout=HEARTBEAT_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                # 心跳 (防止連線超時)
+                frame = format_sse_event("heartbeat", {
+                    "timestamp": datetime.utcnow()
+                })
+
+            yield frame
 
     except asyncio.CancelledError:
         logger.info("SSE connection cancelled")
@@ -119,10 +221,11 @@ async def event_generator(node_secret: str) -> AsyncGenerator[str, None]:
         logger.error(f"SSE error: {e}")
         yield format_sse_event("error", {"message": str(e)})
     finally:
+        _unsubscribe(queue)
         logger.info("SSE connection closed")
 
 
-def format_sse_event(event_type: str, data: dict) -> str:
+def format_sse_event(event_type: str, data: dict) -> bytes:
     """
     格式化 SSE 事件
 
@@ -131,10 +234,12 @@ def format_sse_event(event_type: str, data: dict) -> str:
         data: 事件數據
 
     Returns:
-        SSE 格式的字串
+        SSE 格式的位元組（直接交給 StreamingResponse，無需再編碼）
     """
-    json_data = json.dumps(data, ensure_ascii=False, default=str)
-    return f"event: {event_type}\ndata: {json_data}\n\n"
+    json_data = orjson.dumps(
+        data, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+    return b"event: " + event_type.encode() + b"\ndata: " + json_data + b"\n\n"
 
 
 @router.get("/events")
@@ -153,7 +258,7 @@ async def sse_events(x_node_secret: str = Header(None)):
         - account_update: 帳戶餘額更新 (每 10 秒)
         - position_update: 持倉更新
         - connection_status: 連線狀態變更
-        - heartbeat: 心跳 (每秒)
+        - heartbeat: 心跳 (閒置時每秒)
         - error: 錯誤
     """
     return StreamingResponse(
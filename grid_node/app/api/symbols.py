@@ -3,10 +3,42 @@
 
 封裝 GlobalConfig 交易對配置
 """
+import asyncio
 import logging
+import threading
+from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict
+from typing_extensions import TypedDict
+
+# 配置模型於啟動時載入一次，避免在請求中付出匯入成本
+try:
+    from trading_core.models import (
+        CONFIG_FILE, GlobalConfig, SymbolConfig as ModelSymbolConfig
+    )
+    _CORE_OK = True
+    _CORE_ERR = None
+except ImportError as _e:
+    _CORE_OK = False
+    _CORE_ERR = _e
+
+# 選配模組：可用性於啟動時判斷一次
+try:
+    from coin_selection import SymbolScanner, CoinScorer
+    _SCORE_OK = True
+except ImportError:
+    _SCORE_OK = False
+
+# 回測系統依賴 pandas 等二進位套件，版本不相容時可能拋出 ImportError 以外的錯誤，
+# 不能因此讓整個 Node 啟動失敗
+try:
+    from backtest_system.grid_strategy import GridStrategy
+    from backtest_system.data_loader import DataLoader
+    _BACKTEST_OK = True
+except Exception:
+    _BACKTEST_OK = False
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -16,9 +48,11 @@ router = APIRouter()
 # Schemas
 # ═══════════════════════════════════════════════════════════════════════════
 
-class SymbolConfig(BaseModel):
-    """交易對配置"""
-    symbol: str
+class SymbolUpdate(BaseModel):
+    """交易對可更新參數（交易對由路徑指定）"""
+    # 忽略多餘欄位（前端會連同 symbol 等一併送出），預設值不重新驗證
+    model_config = ConfigDict(extra="ignore", validate_default=False)
+
     enabled: bool = True
     take_profit_spacing: float = 0.004
     grid_spacing: float = 0.006
@@ -26,7 +60,14 @@ class SymbolConfig(BaseModel):
     leverage: int = 20
 
 
-class SymbolResponse(BaseModel):
+class SymbolConfig(SymbolUpdate):
+    """交易對配置"""
+    symbol: str
+
+
+# 響應只做輸出，使用 TypedDict 免去 BaseModel 建構與驗證
+# (pydantic 在 Python < 3.12 需使用 typing_extensions.TypedDict)
+class SymbolResponse(TypedDict):
     """交易對響應"""
     symbol: str
     ccxt_symbol: str
@@ -37,7 +78,7 @@ class SymbolResponse(BaseModel):
     leverage: int
 
 
-class SymbolsListResponse(BaseModel):
+class SymbolsListResponse(TypedDict):
     """交易對列表響應"""
     symbols: List[SymbolResponse]
     total: int
@@ -47,55 +88,143 @@ class SymbolsListResponse(BaseModel):
 # Helper
 # ═══════════════════════════════════════════════════════════════════════════
 
-def load_config():
-    """載入配置"""
+# 支援的計價貨幣後綴（依匹配優先順序），ccxt 永續合約格式為 {coin}/{quote}:{quote}
+_QUOTES = ("USDC", "USDT")
+
+# 配置快取：首次載入後常駐記憶體，修改直接作用於快取物件
+# 以配置檔 mtime 判斷是否被外部修改（如 GUI 或 bot）
+_config_cache = None
+_config_mtime_ns: Optional[int] = None
+_config_lock = threading.RLock()
+# 序列化寫檔，避免並發保存交錯寫入同一檔案
+_save_lock = asyncio.Lock()
+# 交易對列表響應快取（已序列化），任何修改保存時失效
+_list_response_cache: Optional[bytes] = None
+
+
+def _stat_mtime_ns() -> Optional[int]:
+    """配置檔修改時間，檔案不存在時返回 None"""
     try:
-        from trading_core.models import GlobalConfig
-        return GlobalConfig.load()
-    except Exception as e:
-        logger.error(f"Failed to load config: {e}")
+        return CONFIG_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def load_config():
+    """載入配置（檔案未變更時使用記憶體快取）"""
+    global _config_cache, _config_mtime_ns, _list_response_cache
+
+    if not _CORE_OK:
+        logger.error(f"Trading core module not available: {_CORE_ERR}")
         raise HTTPException(500, "Failed to load configuration")
+    
+    with _config_lock:
+        # 保存進行中時檔案可能只寫了一半，沿用快取
+        if _config_cache is not None and _save_lock.locked():
+            return _config_cache
+        
+        mtime_ns = _stat_mtime_ns()
+        if _config_cache is None or mtime_ns != _config_mtime_ns:
+            try:
+                _config_cache = GlobalConfig.load()
+            except Exception as e:
+                logger.error(f"Failed to load config: {e}")
+                raise HTTPException(500, "Failed to load configuration")
+            _config_mtime_ns = mtime_ns
+            _list_response_cache = None
+        return _config_cache
+
 
+def _write_config(snapshot) -> Optional[int]:
+    """以 GlobalConfig.save() 寫入配置快照（於工作執行緒中執行），返回寫入後的 mtime"""
+    snapshot.save()
+    return _stat_mtime_ns()
 
-def save_config(config):
-    """保存配置"""
+
+async def save_config(config):
+    """
+    保存配置
+
+    在事件循環上複製一份快照，再交由執行緒以 GlobalConfig.save() 寫檔，
+    寫檔期間其他請求修改快取物件不影響寫入內容，也不阻塞其他請求
+    """
+    global _config_cache, _config_mtime_ns, _list_response_cache
+
+    _list_response_cache = None
     try:
-        config.save()
+        snapshot = GlobalConfig.from_dict(config.to_dict())
+        async with _save_lock:
+            mtime_ns = await asyncio.to_thread(_write_config, snapshot)
+            # 記錄自己寫入的 mtime，避免下次讀取時誤判為外部修改
+            with _config_lock:
+                _config_mtime_ns = mtime_ns
     except Exception as e:
+        # 寫入失敗時丟棄快取，下次從磁碟重新載入
+        with _config_lock:
+            _config_cache = None
         logger.error(f"Failed to save config: {e}")
         raise HTTPException(500, "Failed to save configuration")
 
 
+# 評分用的掃描器與評分器（首次使用時建立，之後共用）
+_scanner = None
+_scorer = None
+_init_lock = asyncio.Lock()
+
+
+async def _get_score_components():
+    """取得共用的掃描器與評分器"""
+    global _scanner, _scorer
+
+    if _scanner is None:
+        async with _init_lock:
+            if _scanner is None:
+                _scorer = CoinScorer()
+                _scanner = SymbolScanner()
+
+    return _scanner, _scorer
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Endpoints
 # ═══════════════════════════════════════════════════════════════════════════
 
 @router.get("/", response_model=SymbolsListResponse)
-def list_symbols():
+async def list_symbols():
     """
     獲取所有交易對配置
     
     對應 GUI: SymbolsPage 顯示列表
     """
+    global _list_response_cache
+
+    # 先檢查配置檔是否被外部修改（修改時會清除列表快取）
     config = load_config()
     
-    symbols = []
-    for sym_name, sym_config in config.symbols.items():
-        symbols.append(SymbolResponse(
-            symbol=sym_config.symbol,
-            ccxt_symbol=sym_config.ccxt_symbol,
-            enabled=sym_config.enabled,
-            take_profit_spacing=sym_config.take_profit_spacing,
-            grid_spacing=sym_config.grid_spacing,
-            initial_quantity=sym_config.initial_quantity,
-            leverage=getattr(sym_config, 'leverage', 20)
-        ))
+    # 直接返回 Response，跳過 response_model 驗證與 jsonable_encoder
+    # (response_model 僅用於 API 文件)
+    if _list_response_cache is None:
+        symbols: List[SymbolResponse] = [
+            {
+                "symbol": sym_config.symbol,
+                "ccxt_symbol": sym_config.ccxt_symbol,
+                "enabled": sym_config.enabled,
+                "take_profit_spacing": sym_config.take_profit_spacing,
+                "grid_spacing": sym_config.grid_spacing,
+                "initial_quantity": sym_config.initial_quantity,
+                "leverage": sym_config.leverage
+            }
+            for sym_config in config.symbols.values()
+        ]
+        
+        content: SymbolsListResponse = {"symbols": symbols, "total": len(symbols)}
+        _list_response_cache = ORJSONResponse(content).body
     
-    return SymbolsListResponse(symbols=symbols, total=len(symbols))
+    return Response(_list_response_cache, media_type="application/json")
 
 
 @router.post("/", response_model=SymbolResponse)
-def add_symbol(sym: SymbolConfig):
+async def add_symbol(sym: SymbolConfig):
     """
     新增交易對
     
@@ -107,14 +236,13 @@ def add_symbol(sym: SymbolConfig):
     if sym.symbol in config.symbols:
         raise HTTPException(400, f"Symbol {sym.symbol} already exists")
     
-    # 創建 ccxt 格式
-    from trading_core.models import SymbolConfig as ModelSymbolConfig
-    
-    coin = sym.symbol.replace("USDT", "").replace("USDC", "")
-    if "USDC" in sym.symbol:
-        ccxt_symbol = f"{coin}/USDC:USDC"
+    # 創建 ccxt 格式 (依結尾判斷計價貨幣，未匹配時視為 USDT)
+    for quote in _QUOTES:
+        if sym.symbol.endswith(quote):
+            ccxt_symbol = f"{sym.symbol[:-len(quote)]}/{quote}:{quote}"
+            break
     else:
-        ccxt_symbol = f"{coin}/USDT:USDT"
+        ccxt_symbol = f"{sym.symbol}/USDT:USDT"
     
     # 新增到配置
     config.symbols[sym.symbol] = ModelSymbolConfig(
@@ -123,14 +251,16 @@ def add_symbol(sym: SymbolConfig):
         enabled=sym.enabled,
         take_profit_spacing=sym.take_profit_spacing,
         grid_spacing=sym.grid_spacing,
-        initial_quantity=sym.initial_quantity
+        initial_quantity=sym.initial_quantity,
+        leverage=sym.leverage
     )
     
-    save_config(config)
+    await save_config(config)
     
     logger.info(f"Added symbol: {sym.symbol}")
     
-    return SymbolResponse(
+    # 欄位皆來自已驗證的請求，直接返回 Response 跳過 response_model 再驗證
+    return ORJSONResponse(SymbolResponse(
         symbol=sym.symbol,
         ccxt_symbol=ccxt_symbol,
         enabled=sym.enabled,
@@ -138,11 +268,11 @@ def add_symbol(sym: SymbolConfig):
         grid_spacing=sym.grid_spacing,
         initial_quantity=sym.initial_quantity,
         leverage=sym.leverage
-    )
+    ))
 
 
 @router.put("/{symbol}")
-def update_symbol(symbol: str, update: SymbolConfig):
+async def update_symbol(symbol: str, update: SymbolUpdate):
     """
     更新交易對配置
     
@@ -158,8 +288,9 @@ def update_symbol(symbol: str, update: SymbolConfig):
     sym_config.take_profit_spacing = update.take_profit_spacing
     sym_config.grid_spacing = update.grid_spacing
     sym_config.initial_quantity = update.initial_quantity
+    sym_config.leverage = update.leverage
     
-    save_config(config)
+    await save_config(config)
     
     logger.info(f"Updated symbol: {symbol}")
     
@@ -167,7 +298,7 @@ def update_symbol(symbol: str, update: SymbolConfig):
 
 
 @router.delete("/{symbol}")
-def delete_symbol(symbol: str):
+async def delete_symbol(symbol: str):
     """
     刪除交易對
     
@@ -179,7 +310,7 @@ def delete_symbol(symbol: str):
         raise HTTPException(404, f"Symbol {symbol} not found")
     
     del config.symbols[symbol]
-    save_config(config)
+    await save_config(config)
     
     logger.info(f"Deleted symbol: {symbol}")
     
@@ -187,7 +318,7 @@ def delete_symbol(symbol: str):
 
 
 @router.post("/{symbol}/toggle")
-def toggle_symbol(symbol: str):
+async def toggle_symbol(symbol: str):
     """
     切換交易對啟用狀態
     """
@@ -198,7 +329,7 @@ def toggle_symbol(symbol: str):
     
     sym_config = config.symbols[symbol]
     sym_config.enabled = not sym_config.enabled
-    save_config(config)
+    await save_config(config)
     
     status = "enabled" if sym_config.enabled else "disabled"
     logger.info(f"Toggled symbol {symbol}: {status}")
@@ -207,18 +338,18 @@ def toggle_symbol(symbol: str):
 
 
 @router.post("/toggle-all")
-def toggle_all_symbols(enabled: bool):
+async def toggle_all_symbols(enabled: bool):
     """
     批量啟用/停用所有交易對
     """
     config = load_config()
     
-    count = 0
+    # SymbolConfig 為普通 dataclass，直接賦值無驗證成本；全部更新後只保存一次
     for sym_config in config.symbols.values():
         sym_config.enabled = enabled
-        count += 1
+    count = len(config.symbols)
     
-    save_config(config)
+    await save_config(config)
     
     status = "enabled" if enabled else "disabled"
     logger.info(f"Toggled all {count} symbols: {status}")
@@ -233,50 +364,47 @@ async def get_symbol_score(symbol: str):
     
     對應 GUI: SymbolsPage 幣種評分載入
     """
+    if not _SCORE_OK:
+        logger.warning("coin_selection module not available")
+        return ORJSONResponse({
+            "symbol": symbol,
+            "score": None,
+            "error": "評分模組未安裝"
+        })
+    
     try:
-        # 嘗試使用選幣系統的評分器
-        from coin_selection import SymbolScanner, CoinScorer
-        
-        # 初始化掃描器和評分器
-        scanner = SymbolScanner()
-        scorer = CoinScorer()
+        # 使用選幣系統共用的掃描器和評分器
+        scanner, scorer = await _get_score_components()
         
         # 掃描單個幣種
         symbol_data = await scanner.scan_symbol(symbol)
         
         if not symbol_data:
-            return {
+            return ORJSONResponse({
                 "symbol": symbol,
                 "score": None,
                 "error": "無法獲取數據"
-            }
+            })
         
         # 計算評分
         score = scorer.calculate_score(symbol_data)
         
-        return {
+        return ORJSONResponse({
             "symbol": symbol,
             "score": score.total_score,
             "amplitude": score.amplitude_score,
             "trend": score.trend_score,
             "volume": score.volume_score,
             "recommendation": score.recommendation
-        }
+        })
     
-    except ImportError:
-        logger.warning("coin_selection module not available")
-        return {
-            "symbol": symbol,
-            "score": None,
-            "error": "評分模組未安裝"
-        }
     except Exception as e:
         logger.error(f"Failed to get score for {symbol}: {e}")
-        return {
+        return ORJSONResponse({
             "symbol": symbol,
             "score": None,
             "error": str(e)
-        }
+        })
 
 
 @router.get("/{symbol}/preview")
@@ -294,70 +422,66 @@ async def get_symbol_preview(symbol: str, days: int = 30):
         
         sym_config = config.symbols[symbol]
         
-        # 嘗試使用回測系統
-        try:
-            from backtest_system.grid_strategy import GridStrategy
-            from backtest_system.data_loader import DataLoader
-            from datetime import datetime, timedelta
-            
-            # 載入數據
-            loader = DataLoader()
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            # 獲取 K 線數據
-            kline_data = await loader.load_data(
-                symbol=sym_config.ccxt_symbol,
-                start_date=start_date,
-                end_date=end_date,
-                timeframe='1h'
-            )
-            
-            if kline_data is None or len(kline_data) < 100:
-                return {
-                    "symbol": symbol,
-                    "days": days,
-                    "preview": None,
-                    "error": "數據不足"
-                }
-            
-            # 執行回測
-            strategy = GridStrategy(
-                take_profit_spacing=sym_config.take_profit_spacing,
-                grid_spacing=sym_config.grid_spacing,
-                initial_quantity=sym_config.initial_quantity
-            )
-            
-            result = strategy.run(kline_data)
-            
-            return {
-                "symbol": symbol,
-                "days": days,
-                "preview": {
-                    "total_return": result.total_return,
-                    "total_trades": result.total_trades,
-                    "win_rate": result.win_rate,
-                    "max_drawdown": result.max_drawdown,
-                    "sharpe_ratio": result.sharpe_ratio
-                }
-            }
-            
-        except ImportError:
+        # 回測系統未安裝時直接返回
+        if not _BACKTEST_OK:
             logger.warning("backtest_system module not available")
-            return {
+            return ORJSONResponse({
                 "symbol": symbol,
                 "days": days,
                 "preview": None,
                 "error": "回測模組未安裝"
+            })
+        
+        # 載入數據
+        loader = DataLoader()
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        
+        # 獲取 K 線數據
+        kline_data = await loader.load_data(
+            symbol=sym_config.ccxt_symbol,
+            start_date=start_date,
+            end_date=end_date,
+            timeframe='1h'
+        )
+        
+        if kline_data is None or len(kline_data) < 100:
+            return ORJSONResponse({
+                "symbol": symbol,
+                "days": days,
+                "preview": None,
+                "error": "數據不足"
+            })
+        
+        # 執行回測
+        strategy = GridStrategy(
+            take_profit_spacing=sym_config.take_profit_spacing,
+            grid_spacing=sym_config.grid_spacing,
+            initial_quantity=sym_config.initial_quantity
+        )
+        
+        # 回測為 CPU 密集的同步計算，移至執行緒避免阻塞事件循環
+        result = await asyncio.to_thread(strategy.run, kline_data)
+        
+        return ORJSONResponse({
+            "symbol": symbol,
+            "days": days,
+            "preview": {
+                "total_return": result.total_return,
+                "total_trades": result.total_trades,
+                "win_rate": result.win_rate,
+                "max_drawdown": result.max_drawdown,
+                "sharpe_ratio": result.sharpe_ratio
             }
+        })
     
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Failed to get preview for {symbol}: {e}")
-        return {
+        return ORJSONResponse({
             "symbol": symbol,
             "days": days,
             "preview": None,
             "error": str(e)
-        }
+        })
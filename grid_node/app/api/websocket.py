@@ -10,13 +10,31 @@ WebSocket 端點 - 即時數據推送
 import asyncio
 import json
 import logging
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional
+
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+# frame 指紋：優先使用 xxhash (xxh3, C 實作)，未安裝時退回內建 hash
+try:
+    from xxhash import xxh3_64_intdigest as _frame_hash
+except ImportError:
+    _frame_hash = hash
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """
+    序列化 WebSocket 訊息（orjson，支援 numpy 數值）
+
+    以二進位 frame 傳送 UTF-8 JSON，前端需以 TextDecoder 解碼
+    """
+    return orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
 class ConnectionManager:
     """WebSocket 連線管理器"""
     
@@ -38,24 +56,30 @@ class ConnectionManager:
         if not self.active_connections:
             return
         
-        data = json.dumps(message)
-        disconnected = []
+        await self.broadcast_bytes(encode_message(message))
+    
+    async def broadcast_bytes(self, data: bytes):
+        """廣播已序列化的訊息給所有連線"""
+        if not self.active_connections:
+            return
         
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(data)
-            except Exception as e:
-                logger.warning(f"Failed to send to client: {e}")
-                disconnected.append(connection)
+        # 並行發送，總耗時取決於最慢的連線而非所有連線之和
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(connection.send_bytes(data) for connection in connections),
+            return_exceptions=True
+        )
         
         # 清理斷開的連線
-        for conn in disconnected:
-            self.disconnect(conn)
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to send to client: {result}")
+                self.disconnect(connection)
     
     async def send_personal(self, websocket: WebSocket, message: Dict[str, Any]):
         """發送訊息給特定客戶端"""
         try:
-            await websocket.send_text(json.dumps(message))
+            await websocket.send_bytes(encode_message(message))
         except Exception as e:
             logger.warning(f"Failed to send personal message: {e}")
 
@@ -63,13 +87,24 @@ class ConnectionManager:
 # 全局連線管理器
 manager = ConnectionManager()
 
+# 共用更新推送任務（有連線時運行）
+_publisher_task: Optional[asyncio.Task] = None
+
+
+def _ensure_publisher(bot_manager):
+    """啟動共用更新推送任務（若尚未運行）"""
+    global _publisher_task
+    
+    if _publisher_task is None or _publisher_task.done():
+        _publisher_task = asyncio.create_task(periodic_updates(bot_manager))
+
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket 端點 - 即時數據推送
     
-    訊息格式:
+    訊息格式 (二進位 frame，內容為 UTF-8 JSON):
     {
         "type": "account" | "positions" | "indicators" | "log" | "status",
         "data": { ... }
@@ -83,10 +118,8 @@ async def websocket_endpoint(websocket: WebSocket):
         # 連線後立即發送當前狀態
         await send_initial_state(websocket, bot_manager)
         
-        # 開始定期推送更新
-        update_task = asyncio.create_task(
-            periodic_updates(websocket, bot_manager)
-        )
+        # 加入共用的定期推送
+        _ensure_publisher(bot_manager)
         
         # 接收客戶端訊息（保持連線活躍）
         while True:
@@ -112,14 +145,13 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        update_task.cancel()
         manager.disconnect(websocket)
 
 
 async def send_initial_state(websocket: WebSocket, bot_manager):
     """發送初始狀態"""
     try:
-        status = bot_manager._get_heartbeat_status()
+        status = await bot_manager._get_heartbeat_status()
         
         # 發送帳戶餘額
         await manager.send_personal(websocket, {
@@ -159,68 +191,75 @@ async def send_initial_state(websocket: WebSocket, bot_manager):
         logger.error(f"Failed to send initial state: {e}")
 
 
-async def periodic_updates(websocket: WebSocket, bot_manager):
-    """定期推送更新（每 2 秒）"""
-    last_status = {}
+async def periodic_updates(bot_manager):
+    """
+    定期推送更新（每 2 秒）
+
+    所有連線共用一個任務：每輪讀取一次狀態、每個頻道只序列化一次，
+    有變化才廣播；最後一個連線斷開後自動結束
+    """
+    global _publisher_task
     
-    while True:
-        try:
+    # 各頻道上次發送 frame 的 64-bit 指紋，只保存整數而非整個 payload
+    last_hashes: Dict[str, int] = {}
+    
+    try:
+        while manager.active_connections:
             await asyncio.sleep(2)  # 2 秒更新一次
             
-            current_status = bot_manager._get_heartbeat_status()
-            
-            # 只發送變化的數據
-            # 帳戶餘額
-            account_data = {
-                "equity": current_status.get("equity", 0),
-                "available_balance": current_status.get("available_balance", 0),
-                "unrealized_pnl": current_status.get("unrealized_pnl", 0),
-                "total_pnl": current_status.get("total_pnl", 0)
-            }
-            
-            if account_data != last_status.get("account"):
-                await manager.send_personal(websocket, {
-                    "type": "account",
-                    "data": account_data
-                })
-                last_status["account"] = account_data
-            
-            # 持倉
-            positions = current_status.get("positions", [])
-            if positions != last_status.get("positions"):
-                await manager.send_personal(websocket, {
-                    "type": "positions",
-                    "data": positions
-                })
-                last_status["positions"] = positions
-            
-            # 指標
-            indicators = current_status.get("indicators")
-            if indicators and indicators != last_status.get("indicators"):
-                await manager.send_personal(websocket, {
-                    "type": "indicators",
-                    "data": indicators
-                })
-                last_status["indicators"] = indicators
+            try:
+                current_status = await bot_manager._get_heartbeat_status()
                 
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.error(f"Periodic update error: {e}")
-            break
+                # 只發送變化的數據
+                channels = {
+                    # 帳戶餘額
+                    "account": {
+                        "equity": current_status.get("equity", 0),
+                        "available_balance": current_status.get("available_balance", 0),
+                        "unrealized_pnl": current_status.get("unrealized_pnl", 0),
+                        "total_pnl": current_status.get("total_pnl", 0)
+                    },
+                    # 持倉
+                    "positions": current_status.get("positions", []),
+                }
+                # 指標
+                indicators = current_status.get("indicators")
+                if indicators:
+                    channels["indicators"] = indicators
+                
+                for channel, data in channels.items():
+                    frame = encode_message({"type": channel, "data": data})
+                    frame_hash = _frame_hash(frame)
+                    if frame_hash != last_hashes.get(channel):
+                        await manager.broadcast_bytes(frame)
+                        last_hashes[channel] = frame_hash
+                    
+            except Exception as e:
+                logger.error(f"Periodic update error: {e}")
+    
+    finally:
+        _publisher_task = None
 
 
 # 公開的 broadcast 函數供 bot_manager 調用
+# 日誌與成交是事件而非狀態：相同內容的連續事件（如同價同量的兩筆成交）都必須送達，
+# 不做去重；去重只用於 periodic_updates 的狀態頻道
 async def broadcast_log(message: str):
     """廣播交易日誌"""
+    if not manager.active_connections:
+        return
+    
     await manager.broadcast({
         "type": "log",
-        "data": {"message": message, "timestamp": asyncio.get_event_loop().time()}
+        "data": {"message": message, "timestamp": time.monotonic()}
     })
 
 
 async def broadcast_trade(trade: Dict[str, Any]):
     """廣播成交通知"""
+    if not manager.active_connections:
+        return
+    
     await manager.broadcast({
         "type": "trade",
         "data": trade
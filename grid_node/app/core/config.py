@@ -1,35 +1,54 @@
 import os
 import warnings
+from dataclasses import dataclass, field
 
+
+@dataclass(frozen=True, slots=True)
 class Settings:
+    """Node 設定（啟動時由環境變數建立一次，之後唯讀）"""
     PROJECT_NAME: str = "AS Grid Node"
     API_V1_STR: str = "/api/v1"
-    
+
     # Auth Server 連接配置
-    AUTH_SERVER_URL: str = os.getenv("AUTH_SERVER_URL", "")
-    BITGET_UID: str = os.getenv("BITGET_UID", "")
-    NODE_SECRET: str = os.getenv("NODE_SECRET", "default_insecure_secret")
-    
-    # CORS - comma-separated list of allowed origins, defaults to "*" for dev
+    AUTH_SERVER_URL: str = ""
+    BITGET_UID: str = ""
+    NODE_SECRET: str = field(default="default_insecure_secret", repr=False)
+
+    # CORS - allowed origins, defaults to ("*",) for dev
     # In production, set to specific frontend domains
-    CORS_ORIGINS: list = os.getenv("CORS_ORIGINS", "*").split(",")
-    
-    def __init__(self):
-        if "insecure" in self.NODE_SECRET.lower():
-            warnings.warn(
-                "⚠️  WARNING: Using default NODE_SECRET! Set NODE_SECRET environment variable!",
-                UserWarning
-            )
-        if not self.BITGET_UID:
-            warnings.warn(
-                "⚠️  WARNING: BITGET_UID not set! Node will run in standalone mode.",
-                UserWarning
-            )
-        if not self.AUTH_SERVER_URL:
-            warnings.warn(
-                "⚠️  WARNING: AUTH_SERVER_URL not set! Node will run in standalone mode.",
-                UserWarning
-            )
-
-settings = Settings()
+    CORS_ORIGINS: tuple = ("*",)
+
+
+def _load_settings() -> Settings:
+    """讀取環境變數建立設定，並對缺少的關鍵設定發出警告"""
+    cfg = Settings(
+        AUTH_SERVER_URL=os.getenv("AUTH_SERVER_URL", ""),
+        BITGET_UID=os.getenv("BITGET_UID", ""),
+        NODE_SECRET=os.getenv("NODE_SECRET", "default_insecure_secret"),
+        # CORS_ORIGINS: comma-separated; whitespace stripped, empty entries (e.g. trailing comma) dropped
+        CORS_ORIGINS=tuple(
+            origin.strip()
+            for origin in os.getenv("CORS_ORIGINS", "*").split(",")
+            if origin.strip()
+        ),
+    )
+
+    if "insecure" in cfg.NODE_SECRET.lower():
+        warnings.warn(
+            "⚠️  WARNING: Using default NODE_SECRET! Set NODE_SECRET environment variable!",
+            UserWarning
+        )
+    if not cfg.BITGET_UID:
+        warnings.warn(
+            "⚠️  WARNING: BITGET_UID not set! Node will run in standalone mode.",
+            UserWarning
+        )
+    if not cfg.AUTH_SERVER_URL:
+        warnings.warn(
+            "⚠️  WARNING: AUTH_SERVER_URL not set! Node will run in standalone mode.",
+            UserWarning
+        )
+    return cfg
+
 
+settings = _load_settings()
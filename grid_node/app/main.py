@@ -7,13 +7,17 @@ AS Grid Node - 用戶端交易節點 API
 - /api/v1/symbols/* - 交易對管理
 - /api/v1/backtest/* - 回測系統
 """
+import hmac
+import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional
 from app.core.config import settings
 from app.services.bot_manager import bot_manager
+from app.services import auth_client
 
 # API 路由
 from app.api import coin, symbols, backtest, websocket, sse
@@ -27,10 +31,29 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _pin_event_loop_cpu():
+    """
+    將事件循環執行緒綁定到 AUTH_CORE 指定的 CPU（選用，僅 Linux）
+
+    心跳與 WebSocket 喚醒固定在同一核心以重用快取；可再將網卡 IRQ
+    (/proc/irq/<irq>/smp_affinity) 設為同一核心。之後由此執行緒建立的
+    工作執行緒會繼承此設定，因此預設不啟用
+    """
+    core = os.getenv("AUTH_CORE")
+    if not core or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        os.sched_setaffinity(0, {int(core)})
+        logger.info(f"Event loop pinned to CPU {core}")
+    except (ValueError, OSError) as e:
+        logger.warning(f"Failed to pin event loop to CPU {core}: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """應用生命週期管理"""
     # 啟動時初始化
+    _pin_event_loop_cpu()
     logger.info("Initializing Grid Node...")
     result = await bot_manager.initialize()
     logger.info(f"Initialization result: {result}")
@@ -40,19 +63,22 @@ async def lifespan(app: FastAPI):
     # 關閉時清理
     logger.info("Shutting down Grid Node...")
     await bot_manager.shutdown()
+    await coin.close_exchange()
+    await auth_client.close_session()
 
 
 app = FastAPI(
     title="AS Grid Node",
     description="用戶端交易節點 - 完整 GUI 功能 API 版本",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS - Use configurable origins from settings
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
+    allow_origins=list(settings.CORS_ORIGINS),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -66,9 +92,13 @@ app.include_router(websocket.router, prefix="/api/v1", tags=["websocket"])
 app.include_router(sse.router, prefix="/api/v1/sse", tags=["sse"])
 
 
+# 預先編碼，驗證時以常數時間比對（避免時序攻擊）
+_NODE_SECRET = settings.NODE_SECRET.encode()
+
+
 async def verify_secret(x_node_secret: str = Header(...)):
     """驗證 Node Secret"""
-    if x_node_secret != settings.NODE_SECRET:
+    if not hmac.compare_digest(_NODE_SECRET, x_node_secret.encode()):
         raise HTTPException(status_code=403, detail="Invalid Node Secret")
 
 
@@ -102,9 +132,10 @@ async def stop_grid():
 
 
 @app.get("/api/v1/grid/status", dependencies=[Depends(verify_secret)])
-def get_status():
+async def get_status():
     """獲取交易狀態"""
-    return bot_manager.get_status()
+    # 直接返回 Response，跳過 jsonable_encoder
+    return ORJSONResponse(await bot_manager.get_status())
 
 
 @app.post("/api/v1/grid/close_all", dependencies=[Depends(verify_secret)])
@@ -133,7 +164,7 @@ async def execute_command(req: CommandRequest):
 # ═══════════════════════════════════════════════════════════════════════════
 
 @app.get("/api/v1/node/info")
-def get_node_info():
+async def get_node_info():
     """獲取 Node 基本資訊（公開端點）"""
     return {
         "version": "1.0.0",
@@ -144,9 +175,9 @@ def get_node_info():
 
 
 @app.get("/api/v1/health")
-def health_check():
+async def health_check():
     """健康檢查"""
-    status = bot_manager.get_status()
+    status = await bot_manager.get_status()
     return {
         "status": "ok",
         "trading": status.get("is_trading", False),
@@ -155,7 +186,7 @@ def health_check():
 
 
 @app.get("/")
-def root():
+async def root():
     """根端點"""
     return {
         "name": "AS Grid Node",
@@ -3,28 +3,162 @@ AuthClient - 與官方服務通訊的客戶端
 
 負責：
 1. 啟動時註冊並獲取 API 憑證
-2. 定期心跳回報狀態
+2. 定期心跳回報狀態（期間累積的成交事件隨心跳批次送出）
 3. 獲取並執行遠端命令
+
+事件循環由 uvicorn 建立（容器以 --loop uvloop 啟動，未安裝 uvloop 時為標準 asyncio），
+心跳任務與 HTTP 請求皆在該循環上執行，本模組不自行設定事件循環
 """
 import asyncio
+import inspect
+import json
 import logging
 import os
-from datetime import datetime
-from typing import Dict, Optional, Callable
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Awaitable, Dict, List, Optional, Callable, Tuple
+from urllib.parse import quote
 import aiohttp
 
+# 非阻塞 DNS 解析（aiodns）；未安裝時使用 aiohttp 預設的執行緒解析
+try:
+    import aiodns  # noqa: F401
+    _HAS_AIODNS = True
+except ImportError:
+    _HAS_AIODNS = False
+
+try:
+    import orjson
+
+    def _dumps(data) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(data) -> bytes:
+        return json.dumps(data).encode()
+
+    _loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# 白名單快取有效期 (秒)
+WHITELIST_CACHE_TTL = 300.0
+# 心跳失敗時的最長退避間隔 (秒)
+HEARTBEAT_MAX_BACKOFF = 300.0
+# 停止心跳時等待進行中請求完成的時間 (秒)，逾時才取消
+HEARTBEAT_STOP_TIMEOUT = 15.0
+# 心跳間隔可調整範圍 (秒)
+HEARTBEAT_MIN_INTERVAL = 5.0
+HEARTBEAT_MAX_INTERVAL = 120.0
+# 狀態回調的詳細程度：lite 可沿用上次的高成本欄位，每 HEARTBEAT_FULL_EVERY 次心跳要求一次 full
+STATUS_DETAIL_LITE = 0
+STATUS_DETAIL_FULL = 1
+HEARTBEAT_FULL_EVERY = 5
+# 批次回報連續暫時性失敗（逾時、連線錯誤、429、5xx）的重試次數上限，
+# 期間成交留在緩衝隨下一次心跳重送，達上限後改為逐筆送出
+BATCH_RETRY_MAX = 3
+# 保留給 get_commands 的命令上限（無人取用時只保留最新的，避免無限累積）
+COMMAND_BACKLOG_MAX = 100
+
+# 心跳欄位與預設值（status 中僅取這些欄位，其餘忽略）
+_HEARTBEAT_DEFAULTS = {
+    "status": "unknown",
+    "is_trading": False,
+    "total_pnl": 0,
+    "unrealized_pnl": 0,
+    "equity": 0,
+    "available_balance": 0,
+    # 分離的 USDT/USDC 餘額
+    "usdt_equity": 0,
+    "usdt_available": 0,
+    "usdc_equity": 0,
+    "usdc_available": 0,
+    "positions": [],
+    "symbols": [],
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 共用 HTTP Session（整個程序共用連線池，保持 keep-alive 與 TLS 連線）
+# ═══════════════════════════════════════════════════════════════════════════
+
+_SESSION: Optional[aiohttp.ClientSession] = None
+
+
+async def _get_shared_session() -> aiohttp.ClientSession:
+    """
+    獲取共用 HTTP session（首次使用時建立）
+
+    檢查與建立之間沒有 await，在單一事件循環內不會被其他協程插入，
+    並發請求不會重複建立 session，因此無需加鎖
+    """
+    global _SESSION
+    session = _SESSION
+    if session is not None and not session.closed:
+        return session
+    
+    # 沿用系統 nameserver (resolv.conf)，內網服務名稱仍可解析
+    connector = aiohttp.TCPConnector(
+        limit=32,
+        limit_per_host=8,
+        resolver=aiohttp.AsyncResolver() if _HAS_AIODNS else None,
+        use_dns_cache=True,
+        ttl_dns_cache=600,
+        keepalive_timeout=75,
+        enable_cleanup_closed=True
+    )
+    _SESSION = aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=10, connect=3, sock_read=7)
+    )
+    return _SESSION
+
+
+async def close_session():
+    """關閉共用 HTTP session（應用關閉時調用一次）"""
+    global _SESSION
+    if _SESSION is not None and not _SESSION.closed:
+        await _SESSION.close()
+    _SESSION = None
+
+
+def _is_transient_error(result: dict) -> bool:
+    """_request 的錯誤結果是否為暫時性（逾時或連線錯誤無 status、429、5xx）"""
+    status = result.get("status")
+    return status is None or status == 429 or status >= 500
+
 
 class AuthClient:
     """與官方 Auth Server 通訊的客戶端"""
 
+    # 固定屬性集合：省去實例 __dict__，心跳與白名單檢查的屬性讀取更快
+    __slots__ = (
+        # 連接設定
+        "auth_server_url", "bitget_uid", "node_secret",
+        "heartbeat_interval", "trade_batch_size",
+        "_base_url", "_headers", "_whitelist_path",
+        # API 憑證
+        "api_key", "api_secret", "passphrase",
+        # 註冊狀態
+        "jwt_token", "is_registered", "current_uid",
+        # 心跳與命令
+        "_heartbeat_task", "_status_callback", "_status_detail", "_beat_count", "_stop",
+        "_trade_buffer", "_flush_event", "_batch_supported", "_batch_failures",
+        "_last_commands", "_commands_ready", "_handlers", "_ts_cache",
+        # 白名單快取
+        "_whitelist_valid", "_whitelist_expiry", "_whitelist_inflight",
+    )
+
     def __init__(
         self,
         auth_server_url: str = None,
         bitget_uid: str = None,
         node_secret: str = None,
-        heartbeat_interval: int = 30
+        heartbeat_interval: int = 30,
+        trade_batch_size: int = 50
     ):
         """
         初始化 AuthClient
@@ -33,12 +167,19 @@ class AuthClient:
             auth_server_url: 官方伺服器 URL (從環境變數讀取)
             bitget_uid: Bitget Exchange UID (從環境變數讀取)
             node_secret: Node 密鑰 (從環境變數讀取)
-            heartbeat_interval: 心跳間隔（秒）
+            heartbeat_interval: 心跳間隔（秒），亦為成交回報的最長延遲
+            trade_batch_size: 累積多少筆成交時提前送出批次
         """
         self.auth_server_url = auth_server_url or os.getenv("AUTH_SERVER_URL", "")
         self.bitget_uid = bitget_uid or os.getenv("BITGET_UID", "")
         self.node_secret = node_secret or os.getenv("NODE_SECRET", "")
         self.heartbeat_interval = heartbeat_interval
+        self.trade_batch_size = trade_batch_size
+
+        # 請求 URL 前綴、共用 headers 與白名單查詢路徑只組裝一次
+        self._base_url = self.auth_server_url.rstrip("/") + "/api/v1"
+        self._headers: Dict[str, str] = {"Content-Type": "application/json"}
+        self._whitelist_path = "/whitelist/check?uid=" + quote(self.bitget_uid)
 
         # ═══════════════════════════════════════════════════════════════════
         # 【混合式安全設計】API 憑證從環境變數讀取，不從 Server 獲取
@@ -57,38 +198,65 @@ class AuthClient:
         self.current_uid: Optional[str] = None  # UID verified from exchange
         self._heartbeat_task: Optional[asyncio.Task] = None
         self._status_callback: Optional[Callable] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._status_detail = False
+        self._beat_count = 0
+
+        # 成交回報緩衝：(交易資訊, 等待回應的 Future)，由心跳循環批次送出
+        self._trade_buffer: List[Tuple[dict, asyncio.Future]] = []
+        self._flush_event = asyncio.Event()
+        # 協作式停止：心跳循環在請求之間檢查，不中斷進行中的請求
+        self._stop = asyncio.Event()
+        # Server 不支援 /node/batch (404) 時改回逐筆請求
+        self._batch_supported = True
+        self._batch_failures = 0  # 連續暫時性失敗的批次數
+
+        # 心跳回應附帶的命令（尚未被 get_commands 取走），每次心跳回應後觸發事件
+        self._last_commands: deque = deque(maxlen=COMMAND_BACKLOG_MAX)
+        self._commands_ready = asyncio.Event()
+        # 遠端命令處理器 {action: async fn(params)}，由上層 (BotManager) 註冊
+        self._handlers: Dict[str, Callable[[dict], Awaitable]] = {}
 
         # 白名單快取 (用於交易時 UID 驗證)
         self._whitelist_valid: Optional[bool] = None
-        self._whitelist_cache_time: Optional[datetime] = None
-        self._whitelist_cache_ttl: int = 300  # 5 分鐘
+        self._whitelist_expiry: float = 0.0  # time.monotonic() 到期時間
+        # 進行中的白名單查詢，並發呼叫共用同一結果（single-flight）
+        self._whitelist_inflight: Optional[asyncio.Future] = None
+
+        # 心跳時間戳快取 (unix 秒, ISO 字串)
+        self._ts_cache: Tuple[int, str] = (0, "")
         
     async def _get_session(self) -> aiohttp.ClientSession:
-        """獲取或創建 HTTP session"""
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=10)
-            )
-        return self._session
+        """獲取共用 HTTP session"""
+        return await _get_shared_session()
     
     async def _request(self, method: str, endpoint: str, data: dict = None) -> dict:
         """發送 HTTP 請求到 Auth Server"""
         session = await self._get_session()
-        url = f"{self.auth_server_url}/api/v1{endpoint}"
+        url = self._base_url + endpoint
         
-        headers = {"Content-Type": "application/json"}
-        if self.jwt_token:
-            headers["Authorization"] = f"Bearer {self.jwt_token}"
+        # orjson 序列化（較 aiohttp 預設的 json.dumps 快，並支援 numpy 數值）
+        body = _dumps(data) if data is not None else None
         
         try:
-            async with session.request(method, url, json=data, headers=headers) as resp:
+            async with session.request(method, url, data=body, headers=self._headers) as resp:
                 if resp.status == 200:
-                    return await resp.json()
+                    # 直接讀取 bytes 以 orjson 解析，略過 aiohttp 的編碼偵測
+                    raw = await resp.read()
+                    if not raw:
+                        return {}
+                    try:
+                        return _loads(raw)
+                    except ValueError:
+                        logger.error(f"Invalid JSON response from {endpoint} ({len(raw)} bytes)")
+                        return {"error": "bad_json", "raw_len": len(raw)}
+                elif resp.status == 204:
+                    return {}
                 else:
-                    error_text = await resp.text()
+                    # 錯誤頁面（如 502 HTML）可能很大：最多讀取 4KB，不記錄時不解碼
+                    raw = await resp.content.read(4096)
+                    error_text = raw.decode("utf-8", "replace") if logger.isEnabledFor(logging.ERROR) else ""
                     logger.error(f"API error {resp.status}: {error_text}")
-                    return {"error": error_text, "status": resp.status}
+                    return {"error": error_text, "status": resp.status, "raw_len": resp.content_length or 0}
         except asyncio.TimeoutError:
             logger.warning(f"Request timeout: {endpoint}")
             return {"error": "timeout"}
@@ -96,6 +264,14 @@ class AuthClient:
             logger.error(f"Request failed: {e}")
             return {"error": str(e)}
     
+    def _set_jwt(self, token: Optional[str]):
+        """更新 JWT 並同步共用 headers 的 Authorization"""
+        self.jwt_token = token
+        if token:
+            self._headers["Authorization"] = f"Bearer {token}"
+        else:
+            self._headers.pop("Authorization", None)
+    
     async def register(self) -> Optional[dict]:
         """
         向官方伺服器註冊 Node，驗證白名單狀態
@@ -146,7 +322,7 @@ class AuthClient:
             # 註冊失敗可能是白名單問題，不返回憑證
             return None
 
-        self.jwt_token = result.get("token")
+        self._set_jwt(result.get("token"))
         self.is_registered = True
 
         logger.info("Successfully registered with Auth Server")
@@ -171,55 +347,158 @@ class AuthClient:
         if not self.is_registered:
             return {}
         
-        result = await self._request("POST", "/node/heartbeat", {
-            "status": status.get("status", "unknown"),
-            "is_trading": status.get("is_trading", False),
-            "total_pnl": status.get("total_pnl", 0),
-            "unrealized_pnl": status.get("unrealized_pnl", 0),
-            "equity": status.get("equity", 0),
-            "available_balance": status.get("available_balance", 0),
-            # 分離的 USDT/USDC 餘額
-            "usdt_equity": status.get("usdt_equity", 0),
-            "usdt_available": status.get("usdt_available", 0),
-            "usdc_equity": status.get("usdc_equity", 0),
-            "usdc_available": status.get("usdc_available", 0),
-            "positions": status.get("positions", []),
-            "symbols": status.get("symbols", []),
-            "timestamp": datetime.utcnow().isoformat(),
-            # Anti-Bait-and-Switch: 報告當前 API Key 的實際 UID
-            "current_uid": self.current_uid or self.bitget_uid
-        })
-        
-        return result
+        return await self._request("POST", "/node/heartbeat", self._build_heartbeat(status))
+    
+    def _now_iso(self) -> str:
+        """目前 UTC 時間 (ISO 8601，精度到秒)，同一秒內重用已格式化的字串"""
+        sec = int(time.time())
+        if sec != self._ts_cache[0]:
+            self._ts_cache = (sec, datetime.fromtimestamp(sec, tz=timezone.utc).isoformat())
+        return self._ts_cache[1]
+    
+    def _build_heartbeat(self, status: dict) -> dict:
+        """組裝心跳內容（預設值 + status 中的已知欄位）"""
+        payload = _HEARTBEAT_DEFAULTS.copy()
+        for key in _HEARTBEAT_DEFAULTS.keys() & status.keys():
+            payload[key] = status[key]
+        payload["timestamp"] = self._now_iso()
+        # Anti-Bait-and-Switch: 報告當前 API Key 的實際 UID
+        payload["current_uid"] = self.current_uid or self.bitget_uid
+        return payload
     
     async def report_trade(self, trade: dict) -> dict:
         """
         回報成交事件
         
+        心跳運行中時加入緩衝，隨下一次心跳批次送出（最多延遲一個心跳間隔，
+        累積達 trade_batch_size 筆時提前送出）；不需等待結果時可用 create_task 調用
+        
         Args:
             trade: 交易資訊 {symbol, side, price, quantity, pnl}
         """
         if not self.is_registered:
             return {}
         
-        return await self._request("POST", "/node/trade", trade)
+        if self._heartbeat_task is None:
+            return await self._request("POST", "/node/trade", trade)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._trade_buffer.append((trade, future))
+        if len(self._trade_buffer) >= self.trade_batch_size:
+            self._flush_event.set()
+        return await future
+    
+    async def _send_batch(self, status: dict) -> dict:
+        """
+        送出心跳與緩衝中的成交事件（單次請求），返回心跳回應
+        
+        Server 不支援 /node/batch 時退回 heartbeat + 逐筆 trade；批次遇到暫時性錯誤時
+        成交放回緩衝隨下一次心跳重送（最多 BATCH_RETRY_MAX 次），其他錯誤或重試達上限時
+        改為逐筆送出，每筆成交各自取得結果，不會因單次失敗一併遺失
+        """
+        if not self.is_registered:
+            return {}
+        
+        # 取走目前緩衝（單執行緒事件循環，交換列表即可，無需加鎖）
+        pending, self._trade_buffer = self._trade_buffer, []
+        self._flush_event.clear()
+        
+        try:
+            if self._batch_supported:
+                result = await self._request("POST", "/node/batch", {
+                    "status": self._build_heartbeat(status),
+                    "trades": [trade for trade, _ in pending],
+                    "want_commands": True
+                })
+                if result.get("status") == 404:
+                    logger.info("Auth Server has no /node/batch, falling back to per-request reporting")
+                    self._batch_supported = False
+                elif "error" not in result:
+                    self._batch_failures = 0
+                    acks = result.get("trade_acks") or []
+                    for i, (_, future) in enumerate(pending):
+                        if not future.done():
+                            future.set_result(acks[i] if i < len(acks) else result)
+                    return result
+                else:
+                    if pending:
+                        self._batch_failures += 1
+                        if _is_transient_error(result) and self._batch_failures < BATCH_RETRY_MAX:
+                            # 成交未完成，由 finally 放回緩衝，隨下一次心跳重送
+                            logger.warning(f"Batch report failed, requeueing {len(pending)} trades")
+                            return result
+                        self._batch_failures = 0
+                        await self._flush_trades(pending)
+                    return result
+            
+            result = await self.heartbeat(status)
+            await self._flush_trades(pending)
+            return result
+        finally:
+            # 中途被取消（如停止心跳）時，未完成的成交放回緩衝
+            unsent = [item for item in pending if not item[1].done()]
+            if unsent:
+                self._trade_buffer[:0] = unsent
+    
+    async def _flush_trades(self, pending: List[Tuple[dict, asyncio.Future]]):
+        """逐筆送出成交事件並完成對應的 Future"""
+        for trade, future in pending:
+            ack = await self._request("POST", "/node/trade", trade)
+            if not future.done():
+                future.set_result(ack)
     
     async def get_commands(self) -> list:
         """
         獲取待執行的遠端命令
         
+        命令隨心跳回應一併下發，不另外請求 Server：
+        等待下一次心跳回應（最多兩個心跳間隔），取走期間累積的命令
+        
         Returns:
             命令列表 [{action: "start"|"stop"|"update_config", params: {...}}]
         """
         if not self.is_registered:
             return []
         
-        result = await self._request("GET", "/node/commands")
-        return result.get("commands", [])
+        if not self._last_commands:
+            try:
+                await asyncio.wait_for(self._commands_ready.wait(), timeout=self.heartbeat_interval * 2)
+            except asyncio.TimeoutError:
+                pass
+        
+        commands = list(self._last_commands)
+        self._last_commands.clear()
+        self._commands_ready.clear()
+        return commands
+    
+    def set_heartbeat_interval(self, interval: float):
+        """
+        調整心跳間隔（限制在 HEARTBEAT_MIN_INTERVAL ~ HEARTBEAT_MAX_INTERVAL）
+
+        下一個週期起生效；縮短時立即送出一次心跳，不等待原排程
+        """
+        interval = min(max(interval, HEARTBEAT_MIN_INTERVAL), HEARTBEAT_MAX_INTERVAL)
+        if interval == self.heartbeat_interval:
+            return
+        shorter = interval < self.heartbeat_interval
+        self.heartbeat_interval = interval
+        logger.info(f"Heartbeat interval set to {interval:.0f}s")
+        if shorter and self._heartbeat_task:
+            self._flush_event.set()
     
-    def set_status_callback(self, callback: Callable):
-        """設定狀態回調函數（由 BotManager 調用獲取當前狀態）"""
+    def set_status_callback(self, callback: Callable, detail: bool = False):
+        """
+        設定狀態回調函數（由 BotManager 調用獲取當前狀態，可為同步或 async 函數）
+
+        Args:
+            callback: 返回心跳狀態 dict
+            detail: True 時以 callback(detail_level) 調用；第一次及每 HEARTBEAT_FULL_EVERY
+                    次心跳傳入 STATUS_DETAIL_FULL，其餘傳入 STATUS_DETAIL_LITE
+                    （回調可沿用上次的帳戶餘額等高成本欄位）
+        """
         self._status_callback = callback
+        self._status_detail = detail
+        self._beat_count = 0
     
     async def start_heartbeat(self):
         """啟動心跳定時器"""
@@ -227,25 +506,77 @@ class AuthClient:
             return
         
         async def heartbeat_loop():
-            while True:
+            # 以絕對時間排程（單調時鐘），請求耗時不會累積成週期漂移
+            loop = asyncio.get_running_loop()
+            next_deadline = loop.time()
+            early = False
+            # 連續失敗時指數退避（加隨機抖動），避免 Server 恢復時所有 Node 同時重連
+            backoff = self.heartbeat_interval
+            
+            while not self._stop.is_set():
+                failed = False
                 try:
                     # 獲取當前狀態
                     status = {}
                     if self._status_callback:
-                        status = self._status_callback()
+                        if self._status_detail:
+                            full = self._beat_count % HEARTBEAT_FULL_EVERY == 0
+                            self._beat_count += 1
+                            status = self._status_callback(
+                                STATUS_DETAIL_FULL if full else STATUS_DETAIL_LITE
+                            )
+                        else:
+                            status = self._status_callback()
+                        if inspect.isawaitable(status):
+                            status = await status
                     
-                    # 發送心跳
-                    response = await self.heartbeat(status)
+                    # 發送心跳（連同累積的成交事件）
+                    response = await self._send_batch(status)
+                    failed = "error" in response
                     
-                    # 處理命令（如果有）
+                    # 處理命令（如果有），並保留給 get_commands 取用
                     commands = response.get("commands", [])
+                    if not failed:
+                        self._last_commands.extend(commands)
+                        self._commands_ready.set()
                     for cmd in commands:
                         await self._handle_command(cmd)
                     
                 except Exception as e:
                     logger.error(f"Heartbeat error: {e}")
+                    failed = True
+                
+                if failed:
+                    backoff = min(backoff * 2, HEARTBEAT_MAX_BACKOFF)
+                    delay = backoff * (0.5 + random.random() * 0.5)
+                    logger.warning(f"Heartbeat failed, retrying in {delay:.1f}s")
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    # 重試成功後從當下重新起算排程
+                    next_deadline = loop.time()
+                    early = False
+                    continue
+                backoff = self.heartbeat_interval
+                
+                # 提前送出（成交緩衝已滿）不影響原排程
+                if not early:
+                    next_deadline += self.heartbeat_interval
+                
+                now = loop.time()
+                if now >= next_deadline:
+                    # 落後排程：跳過已錯過的週期並保持相位，不連續補發
+                    missed = int((now - next_deadline) // self.heartbeat_interval) + 1
+                    next_deadline += missed * self.heartbeat_interval
+                    logger.warning(f"Heartbeat behind schedule, skipped {missed} tick(s)")
                 
-                await asyncio.sleep(self.heartbeat_interval)
+                # 等待下一個心跳，成交緩衝已滿（或停止）時提前喚醒
+                try:
+                    await asyncio.wait_for(self._flush_event.wait(), next_deadline - now)
+                    early = True
+                except asyncio.TimeoutError:
+                    early = False
         
         self._heartbeat_task = asyncio.create_task(heartbeat_loop())
         logger.info(f"Heartbeat started (interval: {self.heartbeat_interval}s)")
@@ -253,23 +584,43 @@ class AuthClient:
     async def stop_heartbeat(self):
         """停止心跳定時器"""
         if self._heartbeat_task:
-            self._heartbeat_task.cancel()
+            # 先請循環自行結束，讓進行中的請求完成、連線回到連線池
+            self._stop.set()
+            self._flush_event.set()
             try:
-                await self._heartbeat_task
+                await asyncio.wait_for(self._heartbeat_task, HEARTBEAT_STOP_TIMEOUT)
+            except asyncio.TimeoutError:
+                # wait_for 逾時時已取消任務
+                logger.warning("Heartbeat did not stop in time, cancelled")
             except asyncio.CancelledError:
                 pass
             self._heartbeat_task = None
+            self._stop.clear()
+            self._flush_event.clear()
             logger.info("Heartbeat stopped")
+        
+        # 心跳停止後緩衝中的成交逐筆送出，不遺失
+        pending, self._trade_buffer = self._trade_buffer, []
+        await self._flush_trades(pending)
+    
+    def register_handler(self, action: str, handler: Callable[[dict], Awaitable]):
+        """註冊遠端命令處理器（handler 接收命令的 params）"""
+        self._handlers[action] = handler
     
     async def _handle_command(self, cmd: dict):
-        """處理遠端命令"""
+        """處理遠端命令（依 action 查表分派，未註冊的命令只記錄）"""
         action = cmd.get("action")
-        params = cmd.get("params", {})
         
-        logger.info(f"Received command: {action}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Received command: {action}")
         
-        # 命令處理由 BotManager 實現
-        # 這裡只是記錄，實際執行由上層處理
+        handler = self._handlers.get(action)
+        if handler is not None:
+            # 命令執行失敗不影響心跳（不觸發退避）
+            try:
+                await handler(cmd.get("params", {}))
+            except Exception as e:
+                logger.error(f"Command {action} failed: {e}")
     
     # ═══════════════════════════════════════════════════════════════════════
     # 【交易時 UID 驗證】白名單檢查方法
@@ -289,19 +640,36 @@ class AuthClient:
             False = 不在白名單中，禁止交易
         """
         # 檢查快取是否有效
-        if not force and self._whitelist_valid is not None:
-            if self._whitelist_cache_time:
-                cache_age = (datetime.utcnow() - self._whitelist_cache_time).total_seconds()
-                if cache_age < self._whitelist_cache_ttl:
-                    return self._whitelist_valid
+        if not force and self._whitelist_valid is not None and self._whitelist_expiry > time.monotonic():
+            return self._whitelist_valid
 
         # Standalone 模式：直接允許
         if not self.auth_server_url or not self.bitget_uid:
             return True
 
-        # 向 Server 查詢白名單狀態
+        # 已有查詢進行中：等待同一結果，不重複請求
+        # (shield 避免等待者被取消時連帶取消共用的 Future)
+        inflight = self._whitelist_inflight
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._whitelist_inflight = future
         try:
-            result = await self._request("GET", f"/whitelist/check?uid={self.bitget_uid}")
+            is_valid = await self._fetch_whitelist()
+        except BaseException:
+            # 發起者被取消：等待者改用快取結果
+            future.set_result(self._whitelist_valid if self._whitelist_valid is not None else False)
+            raise
+        finally:
+            self._whitelist_inflight = None
+        future.set_result(is_valid)
+        return is_valid
+
+    async def _fetch_whitelist(self) -> bool:
+        """向 Server 查詢白名單狀態並更新快取，失敗時退回快取結果"""
+        try:
+            result = await self._request("GET", self._whitelist_path)
 
             if "error" in result:
                 # 網路錯誤：使用上次快取結果 (寬容模式)
@@ -317,7 +685,7 @@ class AuthClient:
 
             # 更新快取
             self._whitelist_valid = is_valid
-            self._whitelist_cache_time = datetime.utcnow()
+            self._whitelist_expiry = time.monotonic() + WHITELIST_CACHE_TTL
 
             # 記錄警告狀態
             if warning_hours is not None and warning_hours > 0:
@@ -345,27 +713,13 @@ class AuthClient:
         if self._whitelist_valid is None:
             return True  # 首次檢查前默認允許
 
-        if self._whitelist_cache_time:
-            cache_age = (datetime.utcnow() - self._whitelist_cache_time).total_seconds()
-            if cache_age >= self._whitelist_cache_ttl:
-                return True  # 快取過期，需要重新檢查，暫時允許
-
-        return self._whitelist_valid
+        # 快取過期時需要重新檢查，暫時允許
+        return self._whitelist_valid or self._whitelist_expiry <= time.monotonic()
 
     async def close(self):
-        """關閉連接"""
-        await self.stop_heartbeat()
-        if self._session and not self._session.closed:
-            await self._session.close()
-
-
-# 全局實例（可選）
-auth_client: Optional[AuthClient] = None
-
+        """
+        關閉連接
 
-def get_auth_client() -> AuthClient:
-    """獲取全局 AuthClient 實例"""
-    global auth_client
-    if auth_client is None:
-        auth_client = AuthClient()
-    return auth_client
+        共用 session 不在此關閉，由應用關閉時的 close_session() 統一處理
+        """
+        await self.stop_heartbeat()
@@ -7,33 +7,152 @@ BotManager - 交易機器人管理器
 3. 遠端命令執行
 """
 import asyncio
+import functools
+import hashlib
 import os
 import logging
-from typing import Optional, Dict, Any
-from trading_core.bot import MaxGridBot
+import random
+import time
+from typing import Optional, Dict, Any, Tuple, Callable, Set
 from trading_core.models import GlobalConfig, SymbolConfig
-from .auth_client import AuthClient
+from .auth_client import AuthClient, STATUS_DETAIL_FULL
 
 logger = logging.getLogger(__name__)
 
+# 交易所 SDK 於啟動時載入一次；交易核心繼承 ccxt.bitget，兩者一併判斷可用性。
+# 缺少時 Node 仍可啟動（與官方通訊、白名單），交易與餘額查詢返回明確錯誤
+try:
+    import ccxt
+    from trading_core.bot import MaxGridBot
+    _CCXT_OK = True
+    _CCXT_ERR = None
+except ImportError as _e:
+    ccxt = None
+    MaxGridBot = None
+    _CCXT_OK = False
+    _CCXT_ERR = _e
+    logger.error(f"Exchange SDK (ccxt) not available, trading disabled: {_e}")
+
+# 白名單檢查間隔（秒）：連續通過時逐步延長至上限，失敗時縮短至下限
+WHITELIST_CHECK_INTERVAL = float(os.getenv("WHITELIST_CHECK_INTERVAL", "300"))
+WHITELIST_CHECK_MIN = 60.0
+WHITELIST_CHECK_MAX = max(600.0, WHITELIST_CHECK_INTERVAL)
+
+# ccxt 客戶端的固定設定（憑證於建立時另外加入）
+# 不使用 ccxt 內建限速（在呼叫執行緒中 sleep），改由 BITGET_REST_CONCURRENCY 限制同時請求數
+_CCXT_CONFIG_TEMPLATE = {
+    'enableRateLimit': False,
+    'options': {'defaultType': 'swap'},
+}
+
+# 同時進行的 Bitget REST 請求上限（_ccxt_client 的所有同步請求）
+BITGET_REST_CONCURRENCY = 6
+
+# 共用 ccxt 客戶端的重建週期（秒）：定期換新 HTTP session，已載入的 markets 沿用
+CCXT_CLIENT_TTL = 600.0
+
+# 未交易時心跳狀態中取自帳戶餘額的欄位
+_BALANCE_STATUS_KEYS = (
+    "unrealized_pnl", "equity", "available_balance",
+    "usdt_equity", "usdt_available", "usdc_equity", "usdc_available",
+)
+
+# 無憑證或查詢失敗時的餘額（唯讀共用，與快取的餘額 dict 相同，呼叫端不得修改）
+_ZERO_BALANCE: Dict[str, Any] = dict.fromkeys(_BALANCE_STATUS_KEYS, 0)
+
+# 心跳基準間隔（秒）：閒置時加倍，重連或白名單警告期間減半
+HEARTBEAT_INTERVAL = float(os.getenv("HEARTBEAT_INTERVAL", "30"))
+
+# 帳戶餘額快取時間（秒）：略短於心跳間隔，TTL 內的查詢共用同一次 REST 請求
+BALANCE_TTL = 25.0
+
+# 交易中心跳狀態的重用時間（秒）：持倉與帳戶總計未變動時，期間內的查詢直接沿用上次結果
+STATUS_CACHE_TTL = 1.0
+
+
+# 支援的報價幣後綴（只剝除結尾一次，USDCUSDT → USDC/USDT:USDT）
+_QUOTE_SUFFIXES = ("USDC", "USDT")
+
+
+@functools.lru_cache(maxsize=256)
+def _to_ccxt_symbol(symbol: str) -> str:
+    """交易對轉 ccxt 永續合約格式（BTCUSDT → BTC/USDT:USDT，XRPUSDC → XRP/USDC:USDC）"""
+    for quote in _QUOTE_SUFFIXES:
+        if symbol.endswith(quote):
+            coin = symbol[:-len(quote)]
+            break
+    else:
+        coin, quote = symbol, "USDT"
+    return f"{coin}/{quote}:{quote}"
+
 
 class BotManager:
     """交易機器人管理器 - 整合交易核心與官方通訊"""
 
     def __init__(self):
-        self.bot: Optional[MaxGridBot] = None
+        self.bot: Optional["MaxGridBot"] = None
         self.task: Optional[asyncio.Task] = None
         self.auth_client: Optional[AuthClient] = None
         self.is_trading = False
         self.is_paused = False  # 暫停補倉狀態
         self._config: Optional[GlobalConfig] = None
 
+        # 從官方取得的交易所 API 憑證（不寫入 os.environ；未取得時退回 EXCHANGE_* 環境變數）
+        self._credentials: Dict[str, str] = {}
+        self._creds: Optional[Tuple[str, str, str]] = None  # get_credentials 的解析結果，更新憑證時清除
+
+        # 共用的 ccxt 客戶端（憑證變更時才重建，保留 markets 與 HTTP 連線）
+        self._ccxt_client: Optional["ccxt.bitget"] = None
+        self._ccxt_client_key: Optional[Tuple[str, str, str]] = None
+        self._ccxt_client_expires = 0.0
+        self._exchange_calls = 0  # 執行中的 executor 請求數（於事件循環上增減）
+        self._retired_clients: list = []  # 已替換、待請求結束後關閉 session 的舊客戶端
+        self._bitget_sem = asyncio.Semaphore(BITGET_REST_CONCURRENCY)
+
+        # 帳戶餘額快取（見 BALANCE_TTL）
+        self._balance_cache: Optional[Dict[str, Any]] = None
+        self._balance_cache_ts = 0.0
+
+        # API Key 雜湊 → UID（僅存於記憶體，內容皆為本行程向交易所查得的結果）
+        self._uid_cache: Dict[str, str] = {}
+
+        # 指標讀取器：bot 建立後解析一次，心跳時直接調用（指標名 → (dict.get, 預設值)）
+        self._ind_getters: Dict[str, Tuple[Callable[[str, float], float], float]] = {}
+        self._ind_bandit = None
+
+        # 交易對列表快取：MaxGridBot 只在建構時加入交易對，以數量變化作為失效判斷
+        self._cached_symbols_len = -1
+        self._cached_symbol_list: list = []
+        self._cached_first_symbol: Optional[str] = None
+
+        # 狀態 dict 緩衝：鍵固定、原地更新，回傳淺拷貝（比逐鍵建立新 dict 便宜）
+        self._conn_status_buf: Dict[str, Any] = dict.fromkeys((
+            "server_connected", "exchange_connected", "reconnect_attempts",
+            "is_trading", "is_paused", "whitelist_blocked",
+        ))
+        self._idle_status_buf: Dict[str, Any] = {
+            "status": "stopped",
+            "is_trading": False,
+            "is_paused": False,
+            "total_pnl": 0,
+            **dict.fromkeys(_BALANCE_STATUS_KEYS, 0),
+            "positions": [],
+            "symbols": [],
+            "indicators": None
+        }
+        self._status_buf: Dict[str, Any] = dict.fromkeys((
+            "status", "is_trading", "is_paused", "total_pnl", "unrealized_pnl",
+            "equity", "available_balance", "positions", "symbols", "indicators",
+        ))
+        self._status_buf_ts = 0.0  # _status_buf 上次完整重建的時間（monotonic）
+
         # ═══════════════════════════════════════════════════════════════════
         # 【交易時 UID 驗證】白名單狀態
         # ═══════════════════════════════════════════════════════════════════
         self._whitelist_blocked = False  # 是否被白名單阻止
         self._whitelist_warning = False  # 是否在警告期
         self._whitelist_check_task: Optional[asyncio.Task] = None
+        self._whitelist_wake = asyncio.Event()  # set() 可讓檢查迴圈立即重新檢查
 
         # ═══════════════════════════════════════════════════════════════════
         # 【P1: Node 離線處理】連線狀態追蹤
@@ -42,8 +161,12 @@ class BotManager:
         self._exchange_connected = True  # 與交易所的連線狀態
         self._reconnect_attempts = 0  # 重連嘗試次數
         self._max_reconnect_attempts = 10  # 最大重連次數
+        self._reconnect_lock = asyncio.Lock()  # 同時只允許一個重連流程
         self._last_error_time: Optional[float] = None
 
+        # 背景任務（白名單檢查等），結束時自動移除，shutdown 時統一取消
+        self._bg_tasks: Set[asyncio.Task] = set()
+
         # 初始化 AuthClient（如果配置了官方伺服器）
         self._init_auth_client()
     
@@ -57,14 +180,28 @@ class BotManager:
                 auth_server_url=auth_server_url,
                 bitget_uid=bitget_uid,
                 node_secret=os.getenv("NODE_SECRET", ""),
-                heartbeat_interval=30
+                heartbeat_interval=self._hb_interval
             )
             # 設定狀態回調
-            self.auth_client.set_status_callback(self._get_heartbeat_status)
+            self.auth_client.set_status_callback(self._get_heartbeat_status, detail=True)
             logger.info("AuthClient initialized for official server communication")
         else:
             logger.info("Running in standalone mode (no AUTH_SERVER_URL or BITGET_UID)")
     
+    @property
+    def _hb_interval(self) -> float:
+        """依交易與連線狀態計算心跳間隔（AuthClient 會再限制在 5 ~ 120 秒）"""
+        if self._whitelist_warning or self._reconnect_attempts > 0:
+            return HEARTBEAT_INTERVAL / 2
+        if not self.is_trading and self._server_connected:
+            return HEARTBEAT_INTERVAL * 2
+        return HEARTBEAT_INTERVAL
+    
+    def _update_heartbeat_interval(self):
+        """將目前狀態對應的心跳間隔推送給 AuthClient"""
+        if self.auth_client:
+            self.auth_client.set_heartbeat_interval(self._hb_interval)
+    
     async def initialize(self) -> Dict[str, Any]:
         """
         初始化 Node，向官方註冊並獲取 API 憑證
@@ -78,14 +215,17 @@ class BotManager:
             credentials = await self.auth_client.register()
             if credentials:
                 # 使用從官方獲取的 API 憑證
-                os.environ["EXCHANGE_API_KEY"] = credentials.get("api_key", "")
-                os.environ["EXCHANGE_SECRET"] = credentials.get("api_secret", "")
-                os.environ["EXCHANGE_PASSPHRASE"] = credentials.get("passphrase", "")
+                self._credentials = {
+                    "api_key": credentials.get("api_key", ""),
+                    "api_secret": credentials.get("api_secret", ""),
+                    "passphrase": credentials.get("passphrase", ""),
+                }
+                self._creds = None
                 result["mode"] = "connected"
                 result["message"] = "Connected to official server"
                 
                 # === Anti-Bait-and-Switch: 獲取 API Key 的實際 UID ===
-                actual_uid = self._fetch_actual_uid()
+                actual_uid = await self._fetch_actual_uid()
                 if actual_uid:
                     self.auth_client.current_uid = actual_uid
                     logger.info(f"Verified actual UID from exchange: {actual_uid}")
@@ -107,15 +247,26 @@ class BotManager:
         return result
 
     async def _start_whitelist_check(self):
-        """啟動定期白名單檢查 (每 5 分鐘)"""
-        if self._whitelist_check_task:
+        """啟動定期白名單檢查（預設每 5 分鐘，依檢查結果自動調整）"""
+        if self._whitelist_check_task and not self._whitelist_check_task.done():
             return
 
         async def check_loop():
+            loop = asyncio.get_running_loop()
+            interval = WHITELIST_CHECK_INTERVAL
+            woken = False
+            
             while True:
+                # 以檢查開始時間計算下次喚醒，檢查耗時不累積成週期漂移
+                start = loop.time()
+                passed = False
                 try:
                     if self.auth_client:
-                        is_valid = await self.auth_client.check_whitelist()
+                        # 被喚醒或縮短間隔時強制查詢，否則會直接命中白名單快取
+                        is_valid = await self.auth_client.check_whitelist(
+                            force=woken or interval < WHITELIST_CHECK_INTERVAL
+                        )
+                        passed = is_valid
 
                         if not is_valid:
                             if not self._whitelist_blocked:
@@ -132,10 +283,40 @@ class BotManager:
                 except Exception as e:
                     logger.error(f"Whitelist check loop error: {e}")
 
-                await asyncio.sleep(300)  # 5 分鐘檢查一次
+                # 自我調整：連續通過時逐步放寬，失敗時盡快重新確認
+                if passed:
+                    interval = min(interval + WHITELIST_CHECK_MIN, WHITELIST_CHECK_MAX)
+                else:
+                    interval = WHITELIST_CHECK_MIN
 
-        self._whitelist_check_task = asyncio.create_task(check_loop())
-        logger.info("Whitelist check loop started (interval: 5 min)")
+                # 等到下次檢查時間，或被 _whitelist_wake 提前喚醒（重連、開始交易）
+                woken = False
+                try:
+                    await asyncio.wait_for(
+                        self._whitelist_wake.wait(),
+                        timeout=max(0.0, interval - (loop.time() - start))
+                    )
+                    woken = True
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self._whitelist_wake.clear()
+
+        self._whitelist_check_task = self._spawn_background(check_loop())
+        logger.info(f"Whitelist check loop started (interval: {WHITELIST_CHECK_INTERVAL:.0f}s)")
+
+    def _spawn_background(self, coro) -> asyncio.Task:
+        """建立背景任務並納入 _bg_tasks 管理"""
+        task = asyncio.create_task(coro)
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._on_background_done)
+        return task
+
+    def _on_background_done(self, task: asyncio.Task):
+        """背景任務結束：移出 _bg_tasks，並記錄未處理的例外（避免只在 GC 時才出現警告）"""
+        self._bg_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background task failed: {task.exception()!r}")
 
     # ═══════════════════════════════════════════════════════════════════════
     # 【P1: Node 離線處理】離線處理方法
@@ -143,15 +324,16 @@ class BotManager:
 
     def _calculate_backoff(self) -> float:
         """
-        計算指數退避時間
+        計算指數退避時間（full jitter）
 
         Returns:
-            等待時間（秒）：1, 2, 4, 8, 16, 30 (最大)
+            等待時間（秒）：在 0 ~ 1, 2, 4, 8, 16, 30 (最大) 之間隨機取值，
+            避免多個呼叫端同步重試
         """
         base = 1
         max_wait = 30
         wait = min(base * (2 ** self._reconnect_attempts), max_wait)
-        return wait
+        return random.uniform(0, wait)
 
     async def _handle_server_disconnect(self):
         """
@@ -174,9 +356,12 @@ class BotManager:
             self._server_connected = True
             self._reconnect_attempts = 0
             logger.info("✅ AUTH SERVER RECONNECTED: Back to normal mode.")
+            self._update_heartbeat_interval()
 
-            # 強制刷新白名單狀態
-            if self.auth_client:
+            # 強制刷新白名單狀態（有檢查迴圈時交由迴圈立即執行，同步更新阻擋狀態）
+            if self._whitelist_check_task:
+                self._whitelist_wake.set()
+            elif self.auth_client:
                 await self.auth_client.check_whitelist(force=True)
 
     async def _handle_exchange_disconnect(self):
@@ -184,36 +369,42 @@ class BotManager:
         處理與交易所斷線
 
         策略：
-        1. 自動重連（指數退避）
+        1. 自動重連（指數退避 + 隨機抖動，同時只有一個重連流程）
         2. 3 次失敗後暫停新開倉
         3. 10 次失敗後發送告警
         4. 保留現有倉位（不平倉）
         """
-        self._exchange_connected = False
-        self._reconnect_attempts += 1
+        # 已有重連流程進行中：併入該次重試，避免多個呼叫端同時累加次數並同步重試
+        if self._reconnect_lock.locked():
+            return
 
-        wait_time = self._calculate_backoff()
-        logger.warning(
-            f"⚠️ EXCHANGE DISCONNECTED: Attempt {self._reconnect_attempts}/{self._max_reconnect_attempts}. "
-            f"Waiting {wait_time}s before retry..."
-        )
+        async with self._reconnect_lock:
+            self._exchange_connected = False
+            self._reconnect_attempts += 1
+            self._update_heartbeat_interval()
 
-        # 3 次失敗後暫停新開倉
-        if self._reconnect_attempts >= 3 and not self.is_paused:
-            logger.warning("Pausing new positions due to connection issues...")
-            self.is_paused = True
-            if self.bot and hasattr(self.bot, 'set_pause'):
-                self.bot.set_pause(True)
-
-        # 10 次失敗後發送告警
-        if self._reconnect_attempts >= self._max_reconnect_attempts:
-            logger.error(
-                f"🚨 CRITICAL: Exchange reconnection failed after {self._max_reconnect_attempts} attempts! "
-                "Manual intervention may be required."
+            wait_time = self._calculate_backoff()
+            logger.warning(
+                f"⚠️ EXCHANGE DISCONNECTED: Attempt {self._reconnect_attempts}/{self._max_reconnect_attempts}. "
+                f"Waiting {wait_time:.1f}s before retry..."
             )
-            # TODO: 發送通知到 Server / 用戶
 
-        await asyncio.sleep(wait_time)
+            # 3 次失敗後暫停新開倉
+            if self._reconnect_attempts >= 3 and not self.is_paused:
+                logger.warning("Pausing new positions due to connection issues...")
+                self.is_paused = True
+                if self.bot and hasattr(self.bot, 'set_pause'):
+                    self.bot.set_pause(True)
+
+            # 10 次失敗後發送告警
+            if self._reconnect_attempts >= self._max_reconnect_attempts:
+                logger.error(
+                    f"🚨 CRITICAL: Exchange reconnection failed after {self._max_reconnect_attempts} attempts! "
+                    "Manual intervention may be required."
+                )
+                # TODO: 發送通知到 Server / 用戶
+
+            await asyncio.sleep(wait_time)
 
     async def _handle_exchange_reconnect(self):
         """處理與交易所重新連線"""
@@ -221,6 +412,7 @@ class BotManager:
             self._exchange_connected = True
             self._reconnect_attempts = 0
             logger.info("✅ EXCHANGE RECONNECTED: Connection restored.")
+            self._update_heartbeat_interval()
 
             # 如果之前因為斷線而暫停，恢復交易
             if self.is_paused and self._reconnect_attempts == 0:
@@ -245,36 +437,30 @@ class BotManager:
         }
 
         try:
-            import ccxt
-
-            api_key = os.getenv("EXCHANGE_API_KEY", "")
-            api_secret = os.getenv("EXCHANGE_SECRET", "")
-            passphrase = os.getenv("EXCHANGE_PASSPHRASE", "")
-
-            if not api_key or not api_secret:
+            if not _CCXT_OK:
+                result["message"] = f"Exchange SDK (ccxt) not available: {_CCXT_ERR}"
+                return result
+            
+            exchange = self._get_exchange()
+            if exchange is None:
                 result["message"] = "No API credentials configured"
                 return result
 
-            exchange = ccxt.bitget({
-                'apiKey': api_key,
-                'secret': api_secret,
-                'password': passphrase,
-                'enableRateLimit': True,
-                'options': {'defaultType': 'swap'}
-            })
-
-            # 獲取所有持倉
-            positions = exchange.fetch_positions()
-            active_positions = []
-
-            for pos in positions:
-                if pos.get('contracts', 0) > 0 or pos.get('contractSize', 0) > 0:
-                    active_positions.append({
-                        "symbol": pos.get('symbol'),
-                        "side": pos.get('side'),
-                        "contracts": pos.get('contracts', 0),
-                        "unrealizedPnl": pos.get('unrealizedPnl', 0)
-                    })
+            # 只查詢本地 config 的交易對；config 為空時才查詢整個帳戶
+            config = self._config or GlobalConfig.load()
+            ccxt_symbols = [sc.ccxt_symbol for sc in config.symbols.values() if sc.ccxt_symbol]
+            positions = await self._run_exchange_call(exchange.fetch_positions, ccxt_symbols or None)
+
+            active_positions = [
+                {
+                    "symbol": pos.get('symbol'),
+                    "side": pos.get('side'),
+                    "contracts": pos['contracts'],
+                    "unrealizedPnl": pos.get('unrealizedPnl', 0)
+                }
+                for pos in positions
+                if (pos.get('contracts') or 0) > 0
+            ]
 
             result["positions"] = active_positions
             result["recovered"] = True
@@ -293,67 +479,168 @@ class BotManager:
 
     def get_connection_status(self) -> Dict[str, Any]:
         """獲取連線狀態"""
-        return {
-            "server_connected": self._server_connected,
-            "exchange_connected": self._exchange_connected,
-            "reconnect_attempts": self._reconnect_attempts,
-            "is_trading": self.is_trading,
-            "is_paused": self.is_paused,
-            "whitelist_blocked": self._whitelist_blocked
-        }
+        buf = self._conn_status_buf
+        buf["server_connected"] = self._server_connected
+        buf["exchange_connected"] = self._exchange_connected
+        buf["reconnect_attempts"] = self._reconnect_attempts
+        buf["is_trading"] = self.is_trading
+        buf["is_paused"] = self.is_paused
+        buf["whitelist_blocked"] = self._whitelist_blocked
+        return buf.copy()
+
+    def get_credentials(self) -> Tuple[str, str, str]:
+        """
+        獲取交易所 API 憑證
 
-    def _fetch_actual_uid(self) -> Optional[str]:
+        Returns:
+            (api_key, api_secret, passphrase)，優先使用官方下發的憑證，
+            否則讀取 EXCHANGE_* 環境變數（手動設定）；解析結果會快取至憑證更新
+        """
+        if self._creds is None:
+            creds = self._credentials
+            self._creds = (
+                creds.get("api_key") or os.getenv("EXCHANGE_API_KEY", ""),
+                creds.get("api_secret") or os.getenv("EXCHANGE_SECRET", ""),
+                creds.get("passphrase") or os.getenv("EXCHANGE_PASSPHRASE", ""),
+            )
+        return self._creds
+
+    def _get_exchange(self) -> Optional["ccxt.bitget"]:
+        """
+        獲取共用的 ccxt 客戶端（未設定憑證或未安裝 ccxt 時返回 None）
+
+        憑證未變更時重用同一實例：markets 只在首次需要時由 ccxt 載入一次，
+        HTTP 連線亦保持重用；超過 CCXT_CLIENT_TTL 後重建實例，
+        並將已載入的 markets 移交給新實例，不需重新載入
+
+        只能在事件循環執行緒上調用（executor 中只執行取得客戶端後的網路請求），
+        被替換的舊實例待 executor 請求全部結束後才關閉其 session
+        """
+        if not _CCXT_OK:
+            return None
+        
+        api_key, api_secret, passphrase = self.get_credentials()
+        
+        if not api_key or not api_secret:
+            return None
+        
+        key = (api_key, api_secret, passphrase)
+        now = time.monotonic()
+        if self._ccxt_client is None or key != self._ccxt_client_key or now >= self._ccxt_client_expires:
+            previous = self._ccxt_client
+            self._ccxt_client = ccxt.bitget({
+                **_CCXT_CONFIG_TEMPLATE,
+                'apiKey': api_key,
+                'secret': api_secret,
+                'password': passphrase,
+            })
+            if previous is not None:
+                if previous.markets:
+                    self._ccxt_client.set_markets(previous.markets, previous.currencies)
+                self._retire_client(previous)
+            self._ccxt_client_key = key
+            self._ccxt_client_expires = now + CCXT_CLIENT_TTL
+        return self._ccxt_client
+
+    def _retire_client(self, client: "ccxt.bitget"):
+        """登記被替換的客戶端：沒有執行中的請求時立即關閉，否則待最後一個請求結束"""
+        self._retired_clients.append(client)
+        if not self._exchange_calls:
+            self._close_retired_clients()
+
+    def _close_retired_clients(self):
+        """關閉已替換客戶端的 HTTP session"""
+        for client in self._retired_clients:
+            try:
+                client.session.close()
+            except Exception as e:
+                logger.debug(f"Failed to close retired ccxt session: {e}")
+        self._retired_clients.clear()
+
+    async def _run_exchange_call(self, fn: Callable, *args):
+        """
+        在 executor 中執行同步 ccxt 請求，避免阻塞事件循環
+
+        以 _bitget_sem 限制同時請求數（取代 ccxt 內建限速）；名額在執行緒實際結束時才釋放，
+        呼叫端被取消時請求仍在執行緒中進行，不會因此超出上限
+        """
+        await self._bitget_sem.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(None, fn, *args)
+        except BaseException:
+            self._bitget_sem.release()
+            raise
+        self._exchange_calls += 1
+        future.add_done_callback(self._on_exchange_call_done)
+        return await asyncio.shield(future)
+
+    def _on_exchange_call_done(self, future: asyncio.Future):
+        """executor 請求結束（於事件循環上回調）：釋放請求名額，閒置時關閉已替換的客戶端"""
+        self._bitget_sem.release()
+        self._exchange_calls -= 1
+        if not self._exchange_calls and self._retired_clients:
+            self._close_retired_clients()
+        if not future.cancelled():
+            future.exception()  # 呼叫端已取消時不再有人讀取結果，避免 "exception was never retrieved"
+
+    @staticmethod
+    def _uid_from_accounts(accounts) -> Optional[str]:
+        """方法 1: 從 fetch_accounts 的帳戶資訊中提取"""
+        for acc in accounts:
+            if acc.get('info') and acc['info'].get('userId'):
+                return str(acc['info']['userId'])
+        return None
+    
+    @staticmethod
+    def _uid_from_spot_info(result) -> Optional[str]:
+        """方法 2: 從 private_spot_get_v2_spot_account_info 的結果中提取"""
+        if result.get('data') and result['data'].get('userId'):
+            return str(result['data']['userId'])
+        return None
+    
+    def _uid_from_balance(self, balance) -> Optional[str]:
+        """方法 3: 從 fetch_balance 的 info 中提取（餘額一併寫入快取，供之後的心跳使用）"""
+        return self._store_balance(balance)[1]
+    
+    async def _fetch_actual_uid(self) -> Optional[str]:
         """
         從交易所 API 獲取當前 API Key 的實際 UID
         
+        UID 對同一 API Key 固定不變，依 API Key 雜湊快取於記憶體，命中時不發出任何請求。
+        快取不寫入磁碟：本機檔案可被使用者修改，寫入白名單 UID 即可繞過 Anti-Bait-and-Switch，
+        因此每次啟動都向交易所重新查詢。未命中時依序嘗試各方法，直到取得 UID。
+        共用的同步 ccxt 客戶端（requests.Session）不保證執行緒安全，因此不並行請求；
+        executor 中只執行網路請求，解析結果與寫入快取皆在事件循環上進行
+        
         Returns:
             UID 字串，失敗時返回 None
         """
         try:
-            import ccxt
-            
-            api_key = os.getenv("EXCHANGE_API_KEY", "")
-            api_secret = os.getenv("EXCHANGE_SECRET", "")
-            passphrase = os.getenv("EXCHANGE_PASSPHRASE", "")
-            
-            if not api_key or not api_secret:
+            exchange = self._get_exchange()
+            if exchange is None:
                 return None
             
-            exchange = ccxt.bitget({
-                'apiKey': api_key,
-                'secret': api_secret,
-                'password': passphrase,
-                'enableRateLimit': True,
-                'options': {'defaultType': 'swap'}
-            })
+            cache_key = hashlib.sha256(self._ccxt_client_key[0].encode()).hexdigest()
+            cached_uid = self._uid_cache.get(cache_key)
+            if cached_uid:
+                return cached_uid
             
-            # 方法 1: 使用 fetch_accounts 獲取帳戶資訊
-            try:
-                accounts = exchange.fetch_accounts()
-                for acc in accounts:
-                    if acc.get('info') and acc['info'].get('userId'):
-                        return str(acc['info']['userId'])
-            except Exception:
-                pass
-            
-            # 方法 2: 使用 private_spot_get_v2_spot_account_info
-            try:
-                result = exchange.private_spot_get_v2_spot_account_info()
-                if result.get('data') and result['data'].get('userId'):
-                    return str(result['data']['userId'])
-            except Exception:
-                pass
-            
-            # 方法 3: 使用 fetch_balance 並從 info 中提取
-            try:
-                balance = exchange.fetch_balance({'type': 'swap'})
-                if 'info' in balance and isinstance(balance['info'], dict):
-                    # Bitget 可能在不同欄位中放 userId
-                    for key in ['userId', 'uid', 'user_id']:
-                        if balance['info'].get(key):
-                            return str(balance['info'][key])
-            except Exception:
-                pass
+            probes = (
+                ("fetch_accounts", exchange.fetch_accounts, (), self._uid_from_accounts),
+                ("spot_account_info", exchange.private_spot_get_v2_spot_account_info, (), self._uid_from_spot_info),
+                ("fetch_balance", exchange.fetch_balance, ({'type': 'swap'},), self._uid_from_balance),
+            )
+            for method, call, args, extract in probes:
+                try:
+                    uid = extract(await self._run_exchange_call(call, *args))
+                except Exception as e:
+                    logger.debug(f"UID probe {method} failed: {e}")
+                    continue
+                if uid:
+                    # 記錄命中的方法，供日後觀察各方法的可用性
+                    logger.info(f"Fetched UID via {method}")
+                    self._uid_cache[cache_key] = uid
+                    return uid
             
             logger.warning("Could not find UID in any API response")
             return None
@@ -362,145 +649,188 @@ class BotManager:
             logger.error(f"Failed to fetch actual UID: {e}")
             return None
     
-    def _fetch_account_balance(self) -> Dict[str, Any]:
+    async def _fetch_account_balance(self) -> Dict[str, Any]:
         """
         獲取帳戶餘額（不需要 bot 運行時使用）
         
-        使用 ccxt 同步獲取 Bitget 合約帳戶餘額
+        BALANCE_TTL 內重用上次結果；客戶端在事件循環上取得，
+        executor 中只執行 fetch_balance 網路請求，解析與寫入快取回到事件循環
         """
+        if self._balance_cache is not None and time.monotonic() - self._balance_cache_ts < BALANCE_TTL:
+            return self._balance_cache
+        
+        if not _CCXT_OK:
+            return {**_ZERO_BALANCE, "error": f"Exchange SDK (ccxt) not available: {_CCXT_ERR}"}
+        
+        exchange = self._get_exchange()
+        if exchange is None:
+            logger.debug("No API credentials configured")
+            return _ZERO_BALANCE
+        
         try:
-            import ccxt
-            
-            api_key = os.getenv("EXCHANGE_API_KEY", "")
-            api_secret = os.getenv("EXCHANGE_SECRET", "")
-            passphrase = os.getenv("EXCHANGE_PASSPHRASE", "")
-            
-            if not api_key or not api_secret:
-                logger.debug("No API credentials configured")
-                return {"equity": 0, "available_balance": 0, "unrealized_pnl": 0}
-            
-            exchange = ccxt.bitget({
-                'apiKey': api_key,
-                'secret': api_secret,
-                'password': passphrase,
-                'enableRateLimit': True,
-                'options': {'defaultType': 'swap'}
-            })
-            
-            balance = exchange.fetch_balance({'type': 'swap'})
-            
-            total_equity = 0
-            total_available = 0
-            total_unrealized = 0
-            
-            # 分離追蹤 USDT 和 USDC 餘額
-            usdt_equity = 0
-            usdt_available = 0
-            usdc_equity = 0
-            usdc_available = 0
-            
-            for currency in ['USDT', 'USDC']:
-                if currency in balance:
-                    info = balance[currency]
-                    equity = float(info.get('total', 0) or 0)
-                    available = float(info.get('free', 0) or 0)
-                    
-                    total_equity += equity
-                    total_available += available
-                    
-                    # 分開儲存
-                    if currency == 'USDT':
-                        usdt_equity = equity
-                        usdt_available = available
-                    else:
-                        usdc_equity = equity
-                        usdc_available = available
-                    
-                    # Bitget unrealized PnL 可能在 info 中
-                    if 'info' in info and isinstance(info['info'], dict):
-                        total_unrealized += float(info['info'].get('upl', 0) or 0)
-            
-            logger.debug(f"Fetched balance: USDT={usdt_equity}, USDC={usdc_equity}, total={total_equity}")
-            return {
-                "equity": total_equity,
-                "available_balance": total_available,
-                "unrealized_pnl": total_unrealized,
-                # 新增：分離的 USDT/USDC 餘額
-                "usdt_equity": usdt_equity,
-                "usdt_available": usdt_available,
-                "usdc_equity": usdc_equity,
-                "usdc_available": usdc_available
-            }
+            balance = await self._run_exchange_call(exchange.fetch_balance, {'type': 'swap'})
+            balance_info, _ = self._store_balance(balance)
+            return balance_info
             
         except Exception as e:
             logger.error(f"Failed to fetch account balance: {e}")
-            return {
-                "equity": 0, "available_balance": 0, "unrealized_pnl": 0,
-                "usdt_equity": 0, "usdt_available": 0,
-                "usdc_equity": 0, "usdc_available": 0
-            }
+            return _ZERO_BALANCE
+    
+    def _store_balance(self, balance: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        解析 fetch_balance 結果，同時取得合約帳戶餘額與 UID（可能為 None）
+
+        餘額寫入快取（見 BALANCE_TTL），初始化查 UID 後的第一次心跳不必再請求
+        """
+        uid = None
+        if 'info' in balance and isinstance(balance['info'], dict):
+            # Bitget 可能在不同欄位中放 userId
+            for key in ['userId', 'uid', 'user_id']:
+                if balance['info'].get(key):
+                    uid = str(balance['info'][key])
+                    break
+        
+        total_equity = 0
+        total_available = 0
+        total_unrealized = 0
+        
+        # 分離追蹤 USDT 和 USDC 餘額
+        usdt_equity = 0
+        usdt_available = 0
+        usdc_equity = 0
+        usdc_available = 0
+        
+        for currency in ['USDT', 'USDC']:
+            if currency in balance:
+                info = balance[currency]
+                equity = float(info.get('total', 0) or 0)
+                available = float(info.get('free', 0) or 0)
+                
+                total_equity += equity
+                total_available += available
+                
+                # 分開儲存
+                if currency == 'USDT':
+                    usdt_equity = equity
+                    usdt_available = available
+                else:
+                    usdc_equity = equity
+                    usdc_available = available
+                
+                # Bitget unrealized PnL 可能在 info 中
+                if 'info' in info and isinstance(info['info'], dict):
+                    total_unrealized += float(info['info'].get('upl', 0) or 0)
+        
+        logger.debug(f"Fetched balance: USDT={usdt_equity}, USDC={usdc_equity}, total={total_equity}")
+        self._balance_cache = {
+            "equity": total_equity,
+            "available_balance": total_available,
+            "unrealized_pnl": total_unrealized,
+            # 新增：分離的 USDT/USDC 餘額
+            "usdt_equity": usdt_equity,
+            "usdt_available": usdt_available,
+            "usdc_equity": usdc_equity,
+            "usdc_available": usdc_available
+        }
+        self._balance_cache_ts = time.monotonic()
+        return self._balance_cache, uid
     
-    def _get_heartbeat_status(self) -> Dict[str, Any]:
-        """獲取心跳狀態（供 AuthClient 調用）"""
+    def _invalidate_balance_cache(self):
+        """清除餘額快取（交易狀態變更後下次心跳重新查詢）"""
+        self._balance_cache = None
+        self._balance_cache_ts = 0.0
+    
+    async def _get_heartbeat_status(self, detail_level: int = STATUS_DETAIL_FULL) -> Dict[str, Any]:
+        """
+        獲取心跳狀態（供 AuthClient 調用）
+
+        Args:
+            detail_level: AuthClient 的 STATUS_DETAIL_*；lite 且未交易時沿用上次查詢的
+                          帳戶餘額（不論是否過期），僅在 full 或尚無資料時請求交易所
+        """
         if not self.bot:
             # 沒有交易時，嘗試獲取帳戶餘額
-            balance_info = self._fetch_account_balance()
-            return {
-                "status": "stopped",
-                "is_trading": False,
-                "is_paused": self.is_paused,
-                "total_pnl": 0,
-                "unrealized_pnl": balance_info.get("unrealized_pnl", 0),
-                "equity": balance_info.get("equity", 0),
-                "available_balance": balance_info.get("available_balance", 0),
-                # 新增：分離的 USDT/USDC 餘額
-                "usdt_equity": balance_info.get("usdt_equity", 0),
-                "usdt_available": balance_info.get("usdt_available", 0),
-                "usdc_equity": balance_info.get("usdc_equity", 0),
-                "usdc_available": balance_info.get("usdc_available", 0),
-                "positions": [],
-                "symbols": [],
-                "indicators": None
-            }
+            balance_info = self._balance_cache if detail_level < STATUS_DETAIL_FULL else None
+            if balance_info is None:
+                balance_info = await self._fetch_account_balance()
+            buf = self._idle_status_buf
+            buf["is_paused"] = self.is_paused
+            # 含分離的 USDT/USDC 餘額
+            for key in _BALANCE_STATUS_KEYS:
+                buf[key] = balance_info.get(key, 0)
+            return buf.copy()
         
         state = self.bot.state
-        positions = []
-        symbols = []
-        
-        for sym_state in state.symbols.values():
-            positions.append({
-                "symbol": sym_state.symbol,
-                "long": sym_state.long_position,
-                "short": sym_state.short_position,
-                "long_avg_price": sym_state.long_avg_price,
-                "short_avg_price": sym_state.short_avg_price,
-                "unrealized_pnl": getattr(sym_state, 'unrealized_pnl', 0)
-            })
-            symbols.append(sym_state.symbol)
+        buf = self._status_buf
+        now = time.monotonic()
+        if (now - self._status_buf_ts < STATUS_CACHE_TTL
+                and not state.positions_dirty and not state.totals_dirty):
+            # 持倉與總計未變動：僅刷新旗標，沿用上次的計算結果
+            buf["status"] = "running" if state.running else "stopped"
+            buf["is_trading"] = self.is_trading
+            buf["is_paused"] = self.is_paused
+            return buf.copy()
+        
+        positions = state.snapshot_positions()
+        symbols = self._symbol_snapshot()
         
         # 計算總權益 - 優先使用 state 已計算的值
-        state.update_totals()  # 確保 totals 是最新的
-        equity = getattr(state, 'total_equity', 0)
-        available_balance = getattr(state, 'free_balance', 0)
+        if state.totals_dirty:  # bot 更新帳戶後通常已重算，僅在尚未重算時補算
+            state.update_totals()
+        equity = state.total_equity
+        available_balance = state.free_balance
         
-        # 獲取指標數據
-        indicators = self._get_indicators_data()
+        # 獲取指標數據（總持倉沿用快照時已算出的值，不再遍歷交易對）
+        indicators = self._get_indicators_data(state.positions_total)
         
-        return {
-            "status": "running" if state.running else "stopped",
-            "is_trading": self.is_trading,
-            "is_paused": self.is_paused,
-            "total_pnl": state.total_profit,
-            "unrealized_pnl": getattr(state, 'total_unrealized_pnl', 0),
-            "equity": equity,
-            "available_balance": available_balance,
-            "positions": positions,
-            "symbols": symbols,
-            "indicators": indicators
-        }
+        buf["status"] = "running" if state.running else "stopped"
+        buf["is_trading"] = self.is_trading
+        buf["is_paused"] = self.is_paused
+        buf["total_pnl"] = state.total_profit
+        buf["unrealized_pnl"] = state.total_unrealized_pnl
+        buf["equity"] = equity
+        buf["available_balance"] = available_balance
+        buf["positions"] = positions
+        buf["symbols"] = symbols
+        buf["indicators"] = indicators
+        self._status_buf_ts = now
+        return buf.copy()
     
-    def _get_indicators_data(self) -> Dict[str, Any]:
-        """獲取交易指標數據"""
+    def _symbol_snapshot(self) -> list:
+        """獲取交易對列表（唯讀共用，僅在交易對數量變化時重建）"""
+        symbols = self.bot.state.symbols
+        if len(symbols) != self._cached_symbols_len:
+            self._cached_symbol_list = [sym_state.symbol for sym_state in symbols.values()]
+            self._cached_first_symbol = next(iter(symbols), None)
+            self._cached_symbols_len = len(symbols)
+        return self._cached_symbol_list
+    
+    def _bind_indicator_getters(self):
+        """
+        解析 bot 上的指標來源並快取其讀取方法
+
+        指標 dict 皆為原地更新，綁定一次 dict.get 即可持續讀到最新值
+        """
+        getters = {}
+        leading = self.bot.leading_indicator
+        if leading is not None:
+            getters["ofi_value"] = (leading.current_ofi.get, 0)
+            getters["volume_ratio"] = (leading.current_volume_ratio.get, 1.0)
+            getters["spread_ratio"] = (leading.current_spread_ratio.get, 1.0)
+        funding = self.bot.funding_manager
+        if funding is not None:
+            getters["funding_rate"] = (funding.funding_rates.get, 0)
+        
+        self._ind_getters = getters
+        self._ind_bandit = self.bot.bandit_optimizer
+    
+    def _get_indicators_data(self, total_pos: Optional[float] = None) -> Dict[str, Any]:
+        """
+        獲取交易指標數據
+
+        Args:
+            total_pos: 已算好的多空持倉總量；None 時自行遍歷交易對計算
+        """
         if not self.bot:
             return None
         
@@ -515,30 +845,26 @@ class BotManager:
         
         try:
             # 計算總持倉
-            total_pos = 0
-            for sym_state in self.bot.state.symbols.values():
-                total_pos += sym_state.long_position + sym_state.short_position
+            if total_pos is None:
+                total_pos = 0
+                for sym_state in self.bot.state.symbols.values():
+                    total_pos += sym_state.long_position + sym_state.short_position
             indicators["total_positions"] = int(total_pos)
             
-            # 從 Bot 獲取領先指標（如果有）
-            if hasattr(self.bot, 'leading_indicator_mgr') and self.bot.leading_indicator_mgr:
-                li_mgr = self.bot.leading_indicator_mgr
-                first_symbol = next(iter(self.bot.state.symbols.keys()), None)
-                if first_symbol:
-                    indicators["ofi_value"] = li_mgr.current_ofi.get(first_symbol, 0) if hasattr(li_mgr, 'current_ofi') else 0
-                    indicators["volume_ratio"] = li_mgr.current_volume_ratio.get(first_symbol, 1.0) if hasattr(li_mgr, 'current_volume_ratio') else 1.0
-                    indicators["spread_ratio"] = li_mgr.current_spread_ratio.get(first_symbol, 1.0) if hasattr(li_mgr, 'current_spread_ratio') else 1.0
+            # funding_manager 在 bot 連上交易所後才建立，出現後補綁一次
+            if "funding_rate" not in self._ind_getters and self.bot.funding_manager:
+                self._bind_indicator_getters()
             
-            # 從 Bot 獲取 Bandit（如果有）
-            if hasattr(self.bot, 'bandit_optimizer') and self.bot.bandit_optimizer:
-                indicators["bandit_arm"] = getattr(self.bot.bandit_optimizer, 'current_arm_idx', 0)
+            # 領先指標 / Funding Rate（取第一個交易對）
+            self._symbol_snapshot()
+            first_symbol = self._cached_first_symbol
+            if first_symbol:
+                for name, (getter, default) in self._ind_getters.items():
+                    indicators[name] = getter(first_symbol, default)
             
-            # Funding Rate（如果有）
-            if hasattr(self.bot, 'funding_rate_mgr') and self.bot.funding_rate_mgr:
-                fr_mgr = self.bot.funding_rate_mgr
-                first_symbol = next(iter(self.bot.state.symbols.keys()), None)
-                if first_symbol and hasattr(fr_mgr, 'current_rates'):
-                    indicators["funding_rate"] = fr_mgr.current_rates.get(first_symbol, 0)
+            # Bandit 當前 arm
+            if self._ind_bandit is not None:
+                indicators["bandit_arm"] = self._ind_bandit.current_arm_idx
         
         except Exception as e:
             logger.warning(f"Failed to get indicators: {e}")
@@ -563,12 +889,13 @@ class BotManager:
         if self.bot and self.bot.state.running:
             raise ValueError("Bot is already running")
 
-        api_key = os.getenv("EXCHANGE_API_KEY")
-        api_secret = os.getenv("EXCHANGE_SECRET")
-        passphrase = os.getenv("EXCHANGE_PASSPHRASE")
+        if not _CCXT_OK:
+            raise ValueError(f"Trading unavailable: exchange SDK (ccxt) not installed ({_CCXT_ERR})")
+
+        api_key, api_secret, passphrase = self.get_credentials()
 
         if not api_key or not api_secret:
-            raise ValueError("API Keys not found in environment variables")
+            raise ValueError("API Keys not configured")
 
         config = GlobalConfig()
         config.api_key = api_key
@@ -576,13 +903,7 @@ class BotManager:
         config.passphrase = passphrase
         config.symbols.clear()
         
-        coin = symbol.replace("USDT", "").replace("USDC", "")
-        
-        # 判斷合約類型
-        if "USDC" in symbol:
-            ccxt_symbol = f"{coin}/USDC:USDC"
-        else:
-            ccxt_symbol = f"{coin}/USDT:USDT"
+        ccxt_symbol = _to_ccxt_symbol(symbol)
         
         config.symbols[symbol] = SymbolConfig(
             symbol=symbol,
@@ -593,6 +914,9 @@ class BotManager:
 
         self._config = config
         self.bot = MaxGridBot(config)
+        self._bind_indicator_getters()
+        self._cached_symbols_len = -1
+        self._status_buf_ts = 0.0
         self.is_trading = True
         self.is_paused = False
         
@@ -604,8 +928,12 @@ class BotManager:
             finally:
                 self.is_trading = False
                 self.bot = None
+                self._update_heartbeat_interval()
 
         self.task = asyncio.create_task(run())
+        self._invalidate_balance_cache()
+        self._whitelist_wake.set()
+        self._update_heartbeat_interval()
         
         logger.info(f"Trading started: {symbol} qty={quantity}")
         return {"status": "started", "symbol": symbol}
@@ -623,6 +951,11 @@ class BotManager:
             except asyncio.CancelledError:
                 pass
         self.bot = None
+        self._ind_getters = {}
+        self._ind_bandit = None
+        self._cached_symbols_len = -1
+        self._invalidate_balance_cache()
+        self._update_heartbeat_interval()
         
         logger.info("Trading stopped")
         return {"status": "stopped"}
@@ -639,6 +972,7 @@ class BotManager:
         
         try:
             logger.info("Closing all positions...")
+            self._invalidate_balance_cache()
             
             # 調用 bot 的平倉方法
             if hasattr(self.bot, 'close_all_positions'):
@@ -649,6 +983,7 @@ class BotManager:
                 # 如果 bot 沒有這個方法，嘗試直接通過交易所平倉
                 closed = []
                 for sym_state in self.bot.state.symbols.values():
+                    # state 以 ccxt 格式交易對為鍵，sym_state.symbol 即可直接下單
                     symbol = sym_state.symbol
                     if sym_state.long_position > 0 or sym_state.short_position > 0:
                         # 使用 bot 的 exchange 進行平倉
@@ -656,14 +991,14 @@ class BotManager:
                             try:
                                 if sym_state.long_position > 0:
                                     await self.bot.exchange.create_market_sell_order(
-                                        sym_state.ccxt_symbol if hasattr(sym_state, 'ccxt_symbol') else symbol,
+                                        symbol,
                                         sym_state.long_position,
                                         params={'reduceOnly': True}
                                     )
                                     closed.append(f"{symbol} LONG")
                                 if sym_state.short_position > 0:
                                     await self.bot.exchange.create_market_buy_order(
-                                        sym_state.ccxt_symbol if hasattr(sym_state, 'ccxt_symbol') else symbol,
+                                        symbol,
                                         sym_state.short_position,
                                         params={'reduceOnly': True}
                                     )
@@ -698,9 +1033,9 @@ class BotManager:
             "message": f"Trading {status}"
         }
 
-    def get_status(self) -> Dict[str, Any]:
+    async def get_status(self) -> Dict[str, Any]:
         """獲取當前狀態"""
-        return self._get_heartbeat_status()
+        return await self._get_heartbeat_status()
     
     async def handle_command(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -717,7 +1052,11 @@ class BotManager:
         if action == "start":
             symbol = params.get("symbol", "XRPUSDC")
             quantity = params.get("quantity", 30)
-            return self.start(symbol, quantity)
+            try:
+                return await self.start(symbol, quantity)
+            except ValueError as e:
+                # 與未知命令一致，以 error 欄位回報（白名單阻擋、缺少 API Key 等）
+                return {"error": str(e)}
         
         elif action == "stop":
             return await self.stop()
@@ -739,14 +1078,17 @@ class BotManager:
         """關閉 Node"""
         await self.stop()
 
-        # 停止白名單檢查
-        if self._whitelist_check_task:
-            self._whitelist_check_task.cancel()
-            try:
-                await self._whitelist_check_task
-            except asyncio.CancelledError:
-                pass
-            self._whitelist_check_task = None
+        # 停止所有背景任務（白名單檢查等）
+        tasks = list(self._bg_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._whitelist_check_task = None
+
+        if self._ccxt_client is not None:
+            self._retire_client(self._ccxt_client)
+            self._ccxt_client = None
+            self._ccxt_client_key = None
 
         if self.auth_client:
             await self.auth_client.close()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 測試以 grid_node 為根目錄匯入 app 套件（與 uvicorn app.main:app 相同）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
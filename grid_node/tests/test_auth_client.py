@@ -0,0 +1,104 @@
+"""AuthClient 批次回報失敗處理"""
+import asyncio
+
+import pytest
+
+from app.services.auth_client import AuthClient, BATCH_RETRY_MAX
+
+
+def _make_client(monkeypatch, batch_results):
+    """建立已註冊的 AuthClient，/node/batch 依序回應 batch_results，其餘端點回應成功"""
+    calls = []
+    results = iter(batch_results)
+
+    async def fake_request(self, method, endpoint, data=None):
+        calls.append((endpoint, data))
+        if endpoint == "/node/batch":
+            return next(results)
+        if endpoint == "/node/trade":
+            return {"status": "recorded", "symbol": data["symbol"]}
+        return {"status": "ok"}
+
+    monkeypatch.setattr(AuthClient, "_request", fake_request)
+    client = AuthClient(auth_server_url="http://auth.test", bitget_uid="1", node_secret="s")
+    client.is_registered = True
+    return client, calls
+
+
+def _buffer_trades(client, count):
+    """直接放入成交緩衝（不啟動心跳迴圈），返回對應的 Future"""
+    loop = asyncio.get_running_loop()
+    futures = []
+    for i in range(count):
+        future = loop.create_future()
+        client._trade_buffer.append(({"symbol": f"S{i}"}, future))
+        futures.append(future)
+    return futures
+
+
+@pytest.mark.parametrize("error", [
+    {"error": "timeout"},
+    {"error": "Bad Gateway", "status": 502},
+    {"error": "Too Many Requests", "status": 429},
+])
+def test_transient_batch_error_requeues_trades(monkeypatch, error):
+    ok = {"status": "ok", "trade_acks": [{"ack": 0}, {"ack": 1}]}
+    client, calls = _make_client(monkeypatch, [error, ok])
+
+    async def scenario():
+        futures = _buffer_trades(client, 2)
+
+        assert await client._send_batch({}) == error
+        assert not any(f.done() for f in futures)
+        assert [t["symbol"] for t, _ in client._trade_buffer] == ["S0", "S1"]
+
+        await client._send_batch({})
+        assert [f.result() for f in futures] == [{"ack": 0}, {"ack": 1}]
+        assert client._trade_buffer == []
+
+    asyncio.run(scenario())
+    assert [endpoint for endpoint, _ in calls] == ["/node/batch", "/node/batch"]
+
+
+def test_non_transient_batch_error_falls_back_to_per_trade(monkeypatch):
+    error = {"error": "UID mismatch", "status": 403}
+    client, calls = _make_client(monkeypatch, [error])
+
+    async def scenario():
+        futures = _buffer_trades(client, 2)
+        assert await client._send_batch({}) == error
+        return [f.result() for f in futures]
+
+    acks = asyncio.run(scenario())
+    assert acks == [{"status": "recorded", "symbol": "S0"}, {"status": "recorded", "symbol": "S1"}]
+    assert [endpoint for endpoint, _ in calls] == ["/node/batch", "/node/trade", "/node/trade"]
+    assert client._batch_supported
+
+
+def test_repeated_transient_errors_fall_back_after_retry_limit(monkeypatch):
+    error = {"error": "Service Unavailable", "status": 503}
+    client, calls = _make_client(monkeypatch, [error] * BATCH_RETRY_MAX)
+
+    async def scenario():
+        futures = _buffer_trades(client, 1)
+        for _ in range(BATCH_RETRY_MAX):
+            await client._send_batch({})
+        return futures[0].result()
+
+    assert asyncio.run(scenario()) == {"status": "recorded", "symbol": "S0"}
+    endpoints = [endpoint for endpoint, _ in calls]
+    assert endpoints == ["/node/batch"] * BATCH_RETRY_MAX + ["/node/trade"]
+    assert client._batch_failures == 0
+
+
+def test_missing_batch_endpoint_disables_batching(monkeypatch):
+    client, calls = _make_client(monkeypatch, [{"error": "Not Found", "status": 404}])
+
+    async def scenario():
+        futures = _buffer_trades(client, 1)
+        await client._send_batch({})
+        return futures[0].result()
+
+    assert asyncio.run(scenario()) == {"status": "recorded", "symbol": "S0"}
+    assert not client._batch_supported
+    assert [endpoint for endpoint, _ in calls] == ["/node/batch", "/node/heartbeat", "/node/trade"]
@@ -169,6 +169,8 @@ class MaxGridBot:
 
         except Exception as e:
             logger.error(f"同步持倉失敗: {e}")
+        finally:
+            self.state.positions_dirty = True
 
     def _sync_orders(self):
         for sym_config in self.config.symbols.values():
@@ -846,6 +848,8 @@ class MaxGridBot:
                     sym_state.unrealized_pnl = unrealized_pnl
         except Exception as e:
             logger.error(f"[Bitget] 處理持倉更新失敗: {e}")
+        finally:
+            self.state.positions_dirty = True
 
     async def _handle_bitget_account_update(self, data: dict):
         try:
@@ -473,14 +473,44 @@ class GlobalState:
     # 雙向減倉冷卻
     last_reduce_time: Dict[str, float] = field(default_factory=dict)
 
+    # 持倉快照（bot 更新持倉後設 positions_dirty，下次讀取時才重建）
+    positions_dirty: bool = True
+    _positions_snapshot: List[dict] = field(default_factory=list, repr=False)
+    positions_total: float = 0  # 多空持倉總量，與快照同一次遍歷計算
+
+    # 帳戶數據經 get_account 取出修改後為 True，update_totals 重算後清除
+    totals_dirty: bool = True
+
     def get_account(self, currency: str) -> AccountBalance:
-        """獲取指定幣種帳戶"""
+        """獲取指定幣種帳戶（供更新帳戶數據，取出即視為 totals 需要重算）"""
         if currency not in self.accounts:
             self.accounts[currency] = AccountBalance(currency=currency)
+        self.totals_dirty = True
         return self.accounts[currency]
 
+    def snapshot_positions(self) -> List[dict]:
+        """獲取各交易對持倉快照（唯讀共用，持倉未變動時直接返回上次結果）"""
+        if self.positions_dirty:
+            self.positions_dirty = False
+            snapshot = []
+            total = 0
+            for s in self.symbols.values():
+                snapshot.append({
+                    "symbol": s.symbol,
+                    "long": s.long_position,
+                    "short": s.short_position,
+                    "long_avg_price": s.long_avg_price,
+                    "short_avg_price": s.short_avg_price,
+                    "unrealized_pnl": s.unrealized_pnl
+                })
+                total += s.long_position + s.short_position
+            self._positions_snapshot = snapshot
+            self.positions_total = total
+        return self._positions_snapshot
+
     def update_totals(self):
         """更新總計數據"""
+        self.totals_dirty = False
         self.total_equity = sum(acc.equity for acc in self.accounts.values())
         self.free_balance = sum(acc.available_balance for acc in self.accounts.values())
         self.total_unrealized_pnl = sum(acc.unrealized_pnl for acc in self.accounts.values())
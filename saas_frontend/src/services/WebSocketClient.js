@@ -14,6 +14,7 @@ class WebSocketClient {
         this.reconnectDelay = 3000;
         this.isConnected = false;
         this.pingInterval = null;
+        this.decoder = new TextDecoder('utf-8');
     }
 
     /**
@@ -30,6 +31,8 @@ class WebSocketClient {
 
         try {
             this.ws = new WebSocket(`${wsUrl}/api/v1/ws`);
+            // Grid Node 以二進位 frame 傳送 UTF-8 JSON
+            this.ws.binaryType = 'arraybuffer';
 
             this.ws.onopen = () => {
                 console.log('[WebSocket] Connected to Grid Node');
@@ -44,7 +47,10 @@ class WebSocketClient {
 
             this.ws.onmessage = (event) => {
                 try {
-                    const message = JSON.parse(event.data);
+                    const text = typeof event.data === 'string'
+                        ? event.data
+                        : this.decoder.decode(event.data);
+                    const message = JSON.parse(text);
                     this.handleMessage(message);
                 } catch (e) {
                     console.error('[WebSocket] Parse error:', e);